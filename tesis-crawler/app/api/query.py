@@ -168,12 +168,17 @@ async def ask_question(req: QueryRequest):
         history = await session_memory.recent_history(
             session_id, source_id=req.source_id, max_items=12
         )
-        session_state = rag.derive_session_state(
+        derived_state = rag.derive_session_state(
             current_state=session_state,
             query=question,
             history=history,
         )
-        await session_memory.update_state(session_id, session_state)
+        # Only write state back when it changed: last_activity_at is already
+        # bumped by the message appends, so an identical write is just an
+        # extra commit per request.
+        if derived_state != session_state:
+            await session_memory.update_state(session_id, derived_state)
+        session_state = derived_state
 
         result = await _invoke_with_compact_retry(
             graph=graph,
@@ -188,8 +193,9 @@ async def ask_question(req: QueryRequest):
             is_first_turn=is_first_turn,
         )
         answer = apply_source_visibility(answer)
-        session_state["greeting_sent"] = True
-        await session_memory.update_state(session_id, session_state)
+        if not session_state.get("greeting_sent"):
+            session_state["greeting_sent"] = True
+            await session_memory.update_state(session_id, session_state)
         await session_memory.append_assistant(session_id, answer, source_id=req.source_id)
         return {"session_id": session_id, "source_id": str(req.source_id), "answer": answer}
     except Exception as e:
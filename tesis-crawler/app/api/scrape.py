@@ -19,6 +19,13 @@ from sqlalchemy import text
 
 router = APIRouter(tags=["Scrape"])
 
+# Shared by refresh-page requests so the browser and HTTP pool stay warm.
+_refresh_scraper = ScrapingService()
+
+
+async def close_refresh_scraper() -> None:
+    await _refresh_scraper.aclose()
+
 
 class ScrapeRequest(BaseModel):
     url: HttpUrl
@@ -473,11 +480,10 @@ async def quick_refresh_page(req: QuickRefreshRequest):
     Useful for fast precision fixes (e.g., /carreras/medicina) in seconds.
     """
     url = str(req.url)
-    scraper = ScrapingService()
     ingestor = IngestionService()
     classifier = PageClassifier()
 
-    scrape_result = await scraper.scrape_page(url)
+    scrape_result = await _refresh_scraper.scrape_page(url)
     if not scrape_result.success or not (scrape_result.markdown or "").strip():
         return {
             "status": "failed",
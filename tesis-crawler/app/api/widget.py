@@ -1,17 +1,20 @@
+import json
 import logging
 import asyncio
 import uuid
+from collections.abc import AsyncIterator
 from urllib.parse import urlparse
 from uuid import UUID
 
 from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
 from app.auth.service import verify_widget_access_for_source
 from app.config import settings
 from app.core.domain_utils import domain_variants, normalize_domain
-from app.core.chat_format import add_conversational_lead, apply_source_visibility
+from app.core.chat_format import StreamingAnswerFormatter, format_answer
 from app.core.rag_service import RAGService
 from app.core.session_memory import session_memory
 from app.core.widget_origin import allowed_origins_for_domain, get_test_origin, is_origin_allowed_for_source
@@ -21,6 +24,16 @@ router = APIRouter(tags=["Widget"])
 rag = RAGService()
 logger = logging.getLogger(__name__)
 
+WIDGET_FALLBACK_ANSWER = (
+    "No llegué a resolverlo bien en este intento. "
+    "Si querés, lo intento de nuevo con la carrera y el trámite exacto "
+    "(por ejemplo: 'Inscripción a Licenciatura en Enfermería 2026')."
+)
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
 
 def _is_retryable_llm_error(exc: Exception) -> bool:
     if isinstance(exc, TimeoutError):
@@ -40,6 +53,31 @@ def _is_retryable_llm_error(exc: Exception) -> bool:
     )
 
 
+def _graph_payload(*, question: str, source_id: UUID, session_state: dict, history: list[str]) -> dict:
+    return {
+        "query": question,
+        "context": [],
+        "response": "",
+        "history": history,
+        "source_id": str(source_id),
+        "session_state": session_state,
+    }
+
+
+def _compact_payload(payload: dict) -> dict:
+    compact_payload = dict(payload)
+    compact_payload["history"] = (payload.get("history") or [])[-6:]
+    compact_payload["session_state"] = dict(payload.get("session_state") or {}) | {"retry_mode": "compact"}
+    return compact_payload
+
+
+async def _invoke_compact(payload: dict) -> dict:
+    return await asyncio.wait_for(
+        rag.build_graph().ainvoke(_compact_payload(payload)),
+        timeout=float(getattr(settings, "RAG_GRAPH_COMPACT_TIMEOUT_SECONDS", 14)),
+    )
+
+
 async def _invoke_with_compact_retry(
     *,
     question: str,
@@ -48,14 +86,9 @@ async def _invoke_with_compact_retry(
     history: list[str],
 ) -> dict:
     graph = rag.build_graph()
-    payload: dict = {
-        "query": question,
-        "context": [],
-        "response": "",
-        "history": history,
-        "source_id": str(source_id),
-        "session_state": session_state,
-    }
+    payload = _graph_payload(
+        question=question, source_id=source_id, session_state=session_state, history=history
+    )
     try:
         return await asyncio.wait_for(
             graph.ainvoke(payload),
@@ -64,14 +97,42 @@ async def _invoke_with_compact_retry(
     except Exception as exc:
         if not _is_retryable_llm_error(exc):
             raise
-        compact_payload = dict(payload)
-        compact_payload["history"] = (history or [])[-6:]
-        compact_payload["session_state"] = dict(session_state or {}) | {"retry_mode": "compact"}
         logger.warning("Widget RAG primary invoke failed, retrying in compact mode: %s", exc)
-        return await asyncio.wait_for(
-            graph.ainvoke(compact_payload),
-            timeout=float(getattr(settings, "RAG_GRAPH_COMPACT_TIMEOUT_SECONDS", 14)),
-        )
+        return await _invoke_compact(payload)
+
+
+async def _stream_answer(state: dict, *, timeout: float) -> AsyncIterator[str]:
+    """
+    The graph's rewrite → retrieve → generate → verify, with generate streamed.
+    Yields raw answer pieces; leaves the verified answer in state["response"].
+    One deadline bounds the whole run, like wait_for does for graph.ainvoke.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def _remaining() -> float:
+        left = deadline - loop.time()
+        if left <= 0:
+            raise TimeoutError("widget stream deadline exceeded")
+        return left
+
+    llm_timeout = float(getattr(settings, "RAG_LLM_TIMEOUT_SECONDS", 18))
+    state.update(await asyncio.wait_for(rag.rewrite(state), min(llm_timeout, _remaining())))
+    state.update(await asyncio.wait_for(rag.retrieve(state), _remaining()))
+    parts: list[str] = []
+    pieces = rag.stream_generate(state)
+    try:
+        while True:
+            try:
+                piece = await asyncio.wait_for(anext(pieces), _remaining())
+            except StopAsyncIteration:
+                break
+            parts.append(piece)
+            yield piece
+    finally:
+        await pieces.aclose()
+    state["response"] = "".join(parts).strip()
+    state.update(await asyncio.wait_for(rag.verify(state), _remaining()))
 
 
 def _request_domain(request: Request) -> str:
@@ -152,6 +213,100 @@ class WidgetQueryRequest(BaseModel):
     debug: bool = Field(default=False, description="Si true, devuelve los chunks de contexto usados (para evaluación)")
 
 
+async def _authorize_widget_query(
+    req: WidgetQueryRequest,
+    request: Request,
+    x_api_key: str | None,
+):
+    """Resolve the source and check API key + Origin. Raises HTTPException when denied."""
+    api_key = (x_api_key or "").strip()
+    if not api_key:
+        raise HTTPException(status_code=401, detail="Falta X-API-Key")
+    if not api_key.startswith("pfc_sk_"):
+        raise HTTPException(status_code=401, detail="API key invalida")
+
+    source_input = (req.source_id or "").strip()
+    if source_input:
+        source_uuid = await _resolve_source_id_from_input(source_input)
+        if source_uuid is None:
+            raise HTTPException(status_code=404, detail="source_id no existe")
+    else:
+        domain = _request_domain(request)
+        if not domain:
+            raise HTTPException(
+                status_code=422,
+                detail="No se pudo resolver source_id: faltan source_id y Origin/Referer",
+            )
+        source_uuid = await _resolve_source_id_from_domain(domain)
+        if source_uuid is None:
+            raise HTTPException(status_code=404, detail="No se encontro source_id para el dominio de origen")
+
+    logger.info(
+        "widget_query source_input=%s source_uuid=%s origin=%s api_prefix=%s",
+        source_input,
+        str(source_uuid),
+        (request.headers.get("origin") or "").strip(),
+        "_".join(api_key.split("_")[:3]) if api_key else "",
+    )
+
+    auth = await verify_widget_access_for_source(api_key, source_uuid)
+    if (
+        auth is None
+        and _is_localhost_request(request)
+        and (settings.WIDGET_DEV_API_KEY or "").strip()
+        and api_key == (settings.WIDGET_DEV_API_KEY or "").strip()
+    ):
+        class _DevAuth:
+            clerk_user_id = "dev"
+            source_id = source_uuid
+
+        auth = _DevAuth()
+
+    if auth is None:
+        raise HTTPException(status_code=401, detail="API key no autorizada para este source_id")
+
+    origin = (request.headers.get("origin") or "").strip()
+    if origin and not await is_origin_allowed_for_source(origin, auth.source_id):
+        raise HTTPException(status_code=403, detail="Origin no permitido para esta fuente")
+    return auth, source_uuid
+
+
+async def _begin_widget_turn(
+    session_id: str, question: str, source_id: UUID
+) -> tuple[str, dict, list[str], bool]:
+    """Open (or resume) the session and record the user turn.
+
+    Returns (session_id, session_state, history, is_first_turn).
+    """
+    session_id = await session_memory.ensure_session(session_id)
+    session_state = await session_memory.get_state(session_id)
+    prior_history = await session_memory.recent_history(
+        session_id=session_id, source_id=source_id, max_items=1
+    )
+    is_first_turn = len(prior_history) == 0 and not bool(session_state.get("greeting_sent"))
+    await session_memory.append_user(session_id, question, source_id=source_id)
+    history = await session_memory.recent_history(session_id=session_id, source_id=source_id, max_items=12)
+    derived_state = rag.derive_session_state(
+        current_state=session_state,
+        query=question,
+        history=history,
+    )
+    # Only write state back when it changed: last_activity_at is already
+    # bumped by the message appends, so an identical write is just an
+    # extra commit per request.
+    if derived_state != session_state:
+        await session_memory.update_state(session_id, derived_state)
+    return session_id, derived_state, history, is_first_turn
+
+
+async def _finish_widget_turn(session_id: str, session_state: dict, answer: str, source_id: UUID) -> None:
+    """Record the assistant turn and mark the greeting as sent."""
+    if not session_state.get("greeting_sent"):
+        session_state["greeting_sent"] = True
+        await session_memory.update_state(session_id, session_state)
+    await session_memory.append_assistant(session_id, answer, source_id=source_id)
+
+
 @router.post("/widget/query")
 async def widget_query(
     req: WidgetQueryRequest,
@@ -165,91 +320,24 @@ async def widget_query(
     question = (req.question or "").strip()
     metadata = req.metadata or {}
     try:
-        api_key = (x_api_key or "").strip()
-        if not api_key:
-            raise HTTPException(status_code=401, detail="Falta X-API-Key")
-        if not api_key.startswith("pfc_sk_"):
-            raise HTTPException(status_code=401, detail="API key invalida")
-
-        source_input = (req.source_id or "").strip()
-        if source_input:
-            source_uuid = await _resolve_source_id_from_input(source_input)
-            if source_uuid is None:
-                raise HTTPException(status_code=404, detail="source_id no existe")
-        else:
-            domain = _request_domain(request)
-            if not domain:
-                raise HTTPException(
-                    status_code=422,
-                    detail="No se pudo resolver source_id: faltan source_id y Origin/Referer",
-                )
-            source_uuid = await _resolve_source_id_from_domain(domain)
-            if source_uuid is None:
-                raise HTTPException(status_code=404, detail="No se encontro source_id para el dominio de origen")
-
-        logger.info(
-            "widget_query source_input=%s source_uuid=%s origin=%s api_prefix=%s",
-            source_input,
-            str(source_uuid),
-            (request.headers.get("origin") or "").strip(),
-            "_".join(api_key.split("_")[:3]) if api_key else "",
-        )
-
-        auth = await verify_widget_access_for_source(api_key, source_uuid)
-        if (
-            auth is None
-            and _is_localhost_request(request)
-            and (settings.WIDGET_DEV_API_KEY or "").strip()
-            and api_key == (settings.WIDGET_DEV_API_KEY or "").strip()
-        ):
-            class _DevAuth:
-                clerk_user_id = "dev"
-                source_id = source_uuid
-
-            auth = _DevAuth()
-
-        if auth is None:
-            raise HTTPException(status_code=401, detail="API key no autorizada para este source_id")
-
+        auth, source_uuid = await _authorize_widget_query(req, request, x_api_key)
         origin = (request.headers.get("origin") or "").strip()
-        if origin and not await is_origin_allowed_for_source(origin, auth.source_id):
-            raise HTTPException(status_code=403, detail="Origin no permitido para esta fuente")
         if origin:
             response.headers["Access-Control-Allow-Origin"] = origin
             response.headers["Vary"] = "Origin"
             response.headers["Access-Control-Allow-Credentials"] = "true"
 
-        session_id = await session_memory.ensure_session(session_id)
-        session_state = await session_memory.get_state(session_id)
-
-        prior_history = await session_memory.recent_history(
-            session_id=session_id, source_id=auth.source_id, max_items=1
-        )
-        is_first_turn = len(prior_history) == 0 and not bool(session_state.get("greeting_sent"))
-        await session_memory.append_user(session_id, question, source_id=auth.source_id)
-        history = await session_memory.recent_history(session_id=session_id, source_id=auth.source_id, max_items=12)
-        session_state = rag.derive_session_state(
-            current_state=session_state,
-            query=question,
-            history=history,
+        session_id, session_state, history, is_first_turn = await _begin_widget_turn(
+            session_id, question, auth.source_id
         )
-        await session_memory.update_state(session_id, session_state)
-
         result = await _invoke_with_compact_retry(
             question=question,
             source_id=auth.source_id,
             session_state=session_state,
             history=history,
         )
-        answer = add_conversational_lead(
-            (result.get("response") or "").strip(),
-            question,
-            is_first_turn=is_first_turn,
-        )
-        answer = apply_source_visibility(answer)
-        session_state["greeting_sent"] = True
-        await session_memory.update_state(session_id, session_state)
-        await session_memory.append_assistant(session_id, answer, source_id=auth.source_id)
+        answer = format_answer(result.get("response") or "", question, is_first_turn=is_first_turn)
+        await _finish_widget_turn(session_id, session_state, answer, auth.source_id)
         body: dict = {
             "session_id": session_id,
             "source_id": str(auth.source_id),
@@ -264,11 +352,7 @@ async def widget_query(
         raise
     except Exception:
         logger.exception("Widget query failed")
-        fallback_answer = (
-            "No llegué a resolverlo bien en este intento. "
-            "Si querés, lo intento de nuevo con la carrera y el trámite exacto "
-            "(por ejemplo: 'Inscripción a Licenciatura en Enfermería 2026')."
-        )
+        fallback_answer = WIDGET_FALLBACK_ANSWER
         try:
             safe_session = await session_memory.ensure_session(session_id)
             safe_state = await session_memory.get_state(safe_session)
@@ -291,6 +375,93 @@ async def widget_query(
             raise HTTPException(status_code=500, detail="No se pudo procesar la consulta del widget")
 
 
+@router.post("/widget/query/stream")
+async def widget_query_stream(
+    req: WidgetQueryRequest,
+    request: Request,
+    x_api_key: str | None = Header(default=None, alias="X-API-Key"),
+):
+    """
+    SSE variant of /widget/query: `token` events carry the formatted answer as the
+    model generates it, then one `final` event carries the verified answer (same
+    body as /widget/query). Streamed text is always a prefix of the formatted
+    answer (source attribution held back); `final.replaced` flags that the final
+    answer is not what was streamed (verify declined it, or an error/retry).
+    """
+    session_id = (req.session_id or "").strip() or str(uuid.uuid4())
+    question = (req.question or "").strip()
+    metadata = req.metadata or {}
+    # Auth and session bookkeeping run before the stream opens so failures
+    # still surface as regular HTTP errors.
+    auth, _ = await _authorize_widget_query(req, request, x_api_key)
+    session_id, session_state, history, is_first_turn = await _begin_widget_turn(
+        session_id, question, auth.source_id
+    )
+
+    async def event_generator():
+        payload = _graph_payload(
+            question=question, source_id=auth.source_id, session_state=session_state, history=history
+        )
+        state = dict(payload)
+        formatter = StreamingAnswerFormatter(question, is_first_turn=is_first_turn)
+        answer: str | None = None
+        try:
+            try:
+                async for piece in _stream_answer(
+                    state, timeout=float(getattr(settings, "RAG_GRAPH_TIMEOUT_SECONDS", 25))
+                ):
+                    delta = formatter.feed(piece)
+                    if delta:
+                        yield _sse("token", {"text": delta})
+            except Exception as exc:
+                if not _is_retryable_llm_error(exc):
+                    raise
+                logger.warning("Widget streaming query failed, retrying in compact mode: %s", exc)
+                state = await _invoke_compact(payload)
+            answer = format_answer(state.get("response") or "", question, is_first_turn=is_first_turn)
+        except Exception:
+            logger.exception("Widget streaming query failed")
+            answer = WIDGET_FALLBACK_ANSWER
+        finally:
+            # Also runs when the client disconnects mid-stream, so the user
+            # turn never stays without a reply. Shielded: the response task
+            # is being cancelled at that point.
+            try:
+                await asyncio.shield(
+                    _finish_widget_turn(
+                        session_id, session_state, answer or WIDGET_FALLBACK_ANSWER, auth.source_id
+                    )
+                )
+            except Exception:
+                logger.exception("Widget streaming query: failed to persist assistant turn")
+
+        tail = formatter.finish(answer)
+        if tail:
+            yield _sse("token", {"text": tail})
+        body: dict = {
+            "session_id": session_id,
+            "source_id": str(auth.source_id),
+            "user_id": auth.clerk_user_id,
+            "answer": answer,
+            "replaced": formatter.emitted != answer,
+            "metadata_received": bool(metadata),
+        }
+        if req.debug:
+            body["context_chunks"] = state.get("context") or []
+        yield _sse("final", body)
+
+    headers = {
+        "Cache-Control": "no-cache, no-transform",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
 @router.get("/widget/origins/allowed")
 async def widget_allowed_origins(source_id: str):
     source_key = (source_id or "").strip()
@@ -57,6 +57,13 @@ class Settings(BaseSettings):
     PDF_DOC_MAX_SIZE_MB: int = int(os.getenv("PDF_DOC_MAX_SIZE_MB", "15"))
     PDF_DOC_MAX_PAGES: int = int(os.getenv("PDF_DOC_MAX_PAGES", "120"))
 
+    # DB connection pool. retrieve() runs its three SQL branches concurrently,
+    # each on its own connection, so the SQLAlchemy default (5) is too tight.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Recycle before server/proxy idle timeouts drop pooled connections.
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore",
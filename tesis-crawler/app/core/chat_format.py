@@ -54,3 +54,53 @@ def add_conversational_lead(answer: str, question: str, *, is_first_turn: bool =
     if is_first_turn:
         return add_first_turn_greeting(text)
     return strip_repeated_greeting(text)
+
+
+def format_answer(answer: str, question: str, *, is_first_turn: bool = False) -> str:
+    """Final user-facing text: conversational lead, then source visibility."""
+    return apply_source_visibility(
+        add_conversational_lead((answer or "").strip(), question, is_first_turn=is_first_turn)
+    )
+
+
+# Text that format_answer() may still rewrite once more of the answer arrives:
+# trailing whitespace and a partial "Fuente(s)" label (with the whitespace
+# before it), which apply_source_visibility strips together with its tail.
+_UNSTABLE_TAIL_RE = re.compile(r"(?i)\s*(?:f(?:u(?:e(?:n(?:t(?:es?)?)?)?)?)?\s*)?$")
+# The lead (greeting added or stripped) is only decidable once the start of the
+# answer is known.
+_STREAM_LEAD_MIN_CHARS = 32
+
+
+class StreamingAnswerFormatter:
+    """
+    Incremental format_answer() over a streamed model answer. feed() returns
+    only text that the rest of the answer can no longer change, so everything
+    emitted is a prefix of format_answer(full_answer).
+    """
+
+    def __init__(self, question: str, *, is_first_turn: bool = False):
+        self.question = question
+        self.is_first_turn = is_first_turn
+        self.raw = ""
+        self.emitted = ""
+
+    def feed(self, piece: str) -> str:
+        self.raw += piece or ""
+        if len(self.raw.strip()) < _STREAM_LEAD_MIN_CHARS:
+            return ""
+        candidate = format_answer(self.raw, self.question, is_first_turn=self.is_first_turn)
+        stable = candidate[: _UNSTABLE_TAIL_RE.search(candidate).start()]
+        if len(stable) <= len(self.emitted) or not stable.startswith(self.emitted):
+            return ""
+        delta = stable[len(self.emitted):]
+        self.emitted = stable
+        return delta
+
+    def finish(self, answer: str) -> str:
+        """Rest of `answer` when it extends what was emitted; "" when it replaces it."""
+        if not answer.startswith(self.emitted):
+            return ""
+        delta = answer[len(self.emitted):]
+        self.emitted = answer
+        return delta
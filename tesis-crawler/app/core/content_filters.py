@@ -7,6 +7,7 @@ Everything else should remain indexable.
 
 from __future__ import annotations
 
+import re
 
 
 # ── URL-based news detection ─────────────────────────────────────────
@@ -25,6 +26,13 @@ NEWS_TEXT_HINTS = (
     "gacetilla", "nota de prensa", "comunicado de prensa",
 )
 
+# One alternation per token list so each check is a single C-level scan
+# instead of a Python any() over N substring tests. Inputs are lowercased.
+_NEWS_URL_RE = re.compile("|".join(map(re.escape, NEWS_URL_TOKENS)))
+_NEWS_TEXT_RE = re.compile("|".join(map(re.escape, NEWS_TEXT_HINTS)))
+_CAREER_LISTING_URL_RE = re.compile(r"/carreras/|/category/carreras|/oferta-academica/|/ofertas-academicas/")
+_NEWS_CONTENT_SCAN_CHARS = 1000
+
 def _normalize(value: str) -> str:
     return (value or "").strip().lower()
 
@@ -34,20 +42,21 @@ def is_institutional_news(url: str, title: str, content: str = "") -> bool:
     Any True result means the page MUST be blocked — no exceptions.
     """
     url_lc = _normalize(url)
-    title_lc = _normalize(title)
-    content_lc = _normalize(content)
 
     # Do not classify canonical/listing career pages as news just because they
     # include labels like "Novedades y Eventos" in cards/tags.
-    if any(token in url_lc for token in ("/carreras/", "/category/carreras", "/oferta-academica/", "/ofertas-academicas/")):
+    if _CAREER_LISTING_URL_RE.search(url_lc):
         return False
 
-    if any(token in url_lc for token in NEWS_URL_TOKENS):
+    if _NEWS_URL_RE.search(url_lc):
         return True
 
-    title_hit = any(hint in title_lc for hint in NEWS_TEXT_HINTS)
-    content_hit = any(hint in content_lc[:1000] for hint in NEWS_TEXT_HINTS)
-    return title_hit or content_hit
+    if _NEWS_TEXT_RE.search(_normalize(title)):
+        return True
+    # Only the head of the page is scanned; slice before lowercasing so a
+    # long page isn't copied in full.
+    head = (content or "").lstrip()[:_NEWS_CONTENT_SCAN_CHARS]
+    return _NEWS_TEXT_RE.search(head.lower()) is not None
 
 
 def is_non_academic_noise(url: str, title: str, content: str = "") -> bool:
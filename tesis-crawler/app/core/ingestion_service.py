@@ -1,8 +1,12 @@
 import asyncio
 import hashlib
+import io
 import json
 import logging
 import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 from langchain_openai import OpenAIEmbeddings
@@ -12,7 +16,7 @@ from sqlalchemy import delete, select, text as sa_text
 from app.config import settings
 from app.core.content_filters import should_index_page
 from app.core.domain_utils import domain_variants, normalize_domain, normalize_host_exact
-from app.embedding.models import Chunk, Document, EMBEDDING_DIM, ProgramFact, Source, utc_now_naive
+from app.embedding.models import Document, EMBEDDING_DIM, ProgramFact, Source, utc_now_naive
 from app.llm.prompts import CONTEXTUALIZE_CHUNK_SYSTEM, CONTEXTUALIZE_CHUNK_USER
 
 
@@ -30,6 +34,123 @@ CONTEXT_DOC_BUDGET_CHARS = 8000
 CONTEXT_HEAD_CHARS = 2000
 CONTEXT_NEIGHBORHOOD_CHARS = 2000
 
+# Column order of the COPY rows built in IngestionService._copy_chunks.
+_CHUNK_COPY_COLUMNS = (
+    "doc_id",
+    "chunk_id",
+    "text",
+    "context",
+    "embedding",
+    "is_career_page",
+    "token_count",
+    "created_at",
+    "doc_title",
+)
+# Postgres text can't hold NUL at all (the ORM insert fails on it too), so
+# NUL is dropped rather than escaped.
+_COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\x00": None})
+
+
+def _copy_text_field(value: str | None) -> str:
+    """Escape a value for COPY ... (FORMAT text); None becomes \\N."""
+    if value is None:
+        return "\\N"
+    return value.translate(_COPY_TEXT_ESCAPES)
+
+
+# Fact-extraction patterns, compiled once at import instead of per page.
+_DIRECTOR_HIGH_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:director(?:a)?\s+de\s+carrera|direcci[oó]n\s+de\s+carrera|coordinador(?:a)?\s+de\s+carrera|responsable\s+de\s+carrera)\s*[:\-]\s*([^\n|]{3,120})",
+        r"(?:director(?:a)?\s+de\s+(?:la\s+)?carrera(?:\s+de)?[^\n:|]{0,90}?)\s+(?:es\s+)?([A-ZÁÉÍÓÚÑ][^\n|]{3,120})",
+        r"\|\s*(?:director(?:a)?\s+de\s+carrera|direcci[oó]n\s+de\s+carrera|coordinador(?:a)?\s+de\s+carrera)\s*\|\s*([^\|\n]{3,120})\|",
+        r"(?:^|\n)\s*#{1,6}\s*(?:director(?:a)?|direcci[oó]n)(?:\s+de\s+carrera)[^\n]*\n+\s*([^\n|]{3,120})",
+        r"(?:^|\n)\s*(?:director(?:a)?|direcci[oó]n)(?:\s+de\s+carrera)[^\n]*\n+\s*([^\n|]{3,120})",
+    )
+)
+_DIRECTOR_LOW_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:director(?:a)?|coordinador(?:a)?|jef(?:e|a)\s+de\s+carrera)\s*[:\-]\s*([^\n|]{3,120})",
+        r"\|\s*(?:director(?:a)?|coordinador(?:a)?)\s*\|\s*([^\|\n]{3,120})\|",
+        r"(?:^|\n)\s*#{1,6}\s*(?:director(?:a)?|coordinador(?:a)?)[^\n]*\n+\s*([^\n|]{3,120})",
+        r"(?:^|\n)\s*(?:director(?:a)?|coordinador(?:a)?)[^\n]*\n+\s*([^\n|]{3,120})",
+    )
+)
+_SECRETARY_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*[:\-]\s*([^\n|]{3,120})",
+        r"(?:secretar[ií]a\s+acad[eé]mica|coordinaci[oó]n\s+acad[eé]mica)\s*[:\-]\s*([^\n|]{3,120})",
+        r"\|\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\|\s*([^\|\n]{3,120})\|",
+        r"(?:^|\n)\s*#{1,6}\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\n+\s*([^\n|]{3,120})",
+        r"(?:^|\n)\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\n+\s*([^\n|]{3,120})",
+    )
+)
+_DURATION_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:duraci[oó]n(?:\s+de\s+la\s+carrera)?|duraci[oó]n)\s*[:\-]\s*([^\n]{2,80})",
+        r"(?:duraci[oó]n[^\n]{0,30})(\d+\s*(?:a[nñ]os|años)(?:\s+y\s+\d+\s*(?:meses|mes))?)",
+    )
+)
+_YEAR_SUBJECT_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:^|\n)\s*materia\s*:\s*([^\n]{3,120})",
+        r"(?:^|\n)\s*materia\s*:\s*\n+\s*([^\n]{3,120})",
+        r"(?:^|\n)\s*asignatura\s*:\s*([^\n]{3,120})",
+        r"(?:^|\n)\s*asignatura\s*:\s*\n+\s*([^\n]{3,120})",
+        r"(?:^|\n)\s*-\s*([A-ZÁÉÍÓÚÑÜ][A-ZÁÉÍÓÚÑÜ0-9\s\-/]{3,120})\s*(?:\n|$)",
+        r"(?:^|\n)\s*([A-ZÁÉÍÓÚÑÜ][A-Za-zÁÉÍÓÚÑÜáéíóúñü0-9\s().,\-/]{3,120})\s*\|",
+    )
+)
+_PROGRAM_NAME_TITLE_RE = re.compile(
+    r"\b("
+    r"medicina|"
+    r"lic\.?\s+en\s+[a-záéíóúñü\s]+|"
+    r"licenciatura\s+en\s+[a-záéíóúñü\s]+|"
+    r"tecnicatura\s+en\s+[a-záéíóúñü\s]+|"
+    r"doctorado\s+en\s+[a-záéíóúñü\s]+|"
+    r"especializaci[oó]n\s+en\s+[a-záéíóúñü\s]+"
+    r")\b",
+    flags=re.IGNORECASE,
+)
+_TITLED_PERSON_RE = re.compile(
+    r"\b(?:prof\.?|dr\.?|dra\.?|lic\.?|mgter\.?|mgtr\.?|mg\.?|esp\.?|msc\.?)\b",
+    flags=re.IGNORECASE,
+)
+_PROGRAM_PAGE_SIGNALS = (
+    "duración de la carrera",
+    "duracion de la carrera",
+    "director de carrera",
+    "dirección de carrera",
+    "direccion de carrera",
+    "coordinador de carrera",
+    "responsable de carrera",
+    "plan de estudios",
+    "perfil del egresado",
+    "alcances del título",
+    "alcances del titulo",
+    "incumbencias",
+    "carga horaria",
+    "materia:",
+    "asignatura:",
+)
+# One scan over the haystack instead of one substring search per signal.
+_PROGRAM_PAGE_SIGNALS_RE = re.compile("|".join(map(re.escape, _PROGRAM_PAGE_SIGNALS)))
+_CAREER_HOME_URL_RE = re.compile(r"/carreras/[^/]+\Z")
+
+
+@dataclass
+class PreparedChunks:
+    """Chunk texts with their contexts and embeddings, ready to be written."""
+
+    texts: list[str]
+    contexts: list[str]
+    embeddings: list[list[float]]
+
 
 class IngestionService:
     YEAR_LABELS: list[tuple[int, tuple[str, ...]]] = [
@@ -88,26 +209,7 @@ class IngestionService:
         if not program_name or program_name == "__general__":
             return False
         haystack = f"{(url or '').lower()} {(title or '').lower()} {(content or '').lower()[:3500]}"
-        return any(
-            token in haystack
-            for token in (
-                "duración de la carrera",
-                "duracion de la carrera",
-                "director de carrera",
-                "dirección de carrera",
-                "direccion de carrera",
-                "coordinador de carrera",
-                "responsable de carrera",
-                "plan de estudios",
-                "perfil del egresado",
-                "alcances del título",
-                "alcances del titulo",
-                "incumbencias",
-                "carga horaria",
-                "materia:",
-                "asignatura:",
-            )
-        )
+        return _PROGRAM_PAGE_SIGNALS_RE.search(haystack) is not None
 
     @staticmethod
     def _is_year_subject_fact_source(url: str, page_type: str) -> bool:
@@ -125,7 +227,7 @@ class IngestionService:
 
     @staticmethod
     def _is_duration_value_plausible(value: str) -> bool:
-        raw = re.sub(r"\s+", " ", (value or "").lower()).strip()
+        raw = " ".join((value or "").lower().split())
         if not raw:
             return False
         m = re.search(r"(\d{1,2})\s*(?:a[nñ]os|años)\b", raw)
@@ -228,19 +330,14 @@ class IngestionService:
             *[self._contextualize_one(sem, w, c) for w, c in zip(windows, chunk_texts)]
         )
 
-    async def _replace_chunks_for_doc(self, session, doc_id, content: str) -> int:
+    async def prepare_chunks(self, content: str) -> PreparedChunks:
         """
-        Re-chunk, optionally contextualize, and re-embed a document.
-        Deletes existing chunks for the doc and inserts fresh ones.
-        Returns the number of chunks written.
+        Chunk, optionally contextualize, and embed a cleaned document.
+        Touches no database, so callers can run it before opening a transaction.
         """
-        await session.execute(
-            sa_text("DELETE FROM chunks WHERE doc_id = :doc_id"),
-            {"doc_id": str(doc_id)},
-        )
         chunk_texts = [c.strip() for c in self.splitter.split_text(content or "") if c and c.strip()]
         if not chunk_texts:
-            return 0
+            return PreparedChunks(texts=[], contexts=[], embeddings=[])
 
         contexts: list[str] = []
         if self.contextualize_enabled:
@@ -254,22 +351,125 @@ class IngestionService:
             else:
                 embed_inputs.append(chunk_text)
         embeddings = await self.embedder.aembed_documents(embed_inputs)
+        return PreparedChunks(texts=chunk_texts, contexts=contexts, embeddings=embeddings)
+
+    async def _replace_chunks_for_doc(
+        self,
+        session,
+        doc_id,
+        content: str,
+        canonical_url: str = "",
+        prepared: PreparedChunks | None = None,
+        title: str = "",
+    ) -> int:
+        """
+        Deletes existing chunks for the doc and inserts fresh ones, from
+        `prepared` when the caller already chunked/embedded the content.
+        Returns the number of chunks written.
+        """
+        await session.execute(
+            sa_text("DELETE FROM chunks WHERE doc_id = :doc_id"),
+            {"doc_id": str(doc_id)},
+        )
+        if prepared is None:
+            prepared = await self.prepare_chunks(content)
+        if not prepared.texts:
+            return 0
 
         now = utc_now_naive()
+        is_career_page = IngestionService._is_career_home_url(canonical_url)
+        await self._copy_chunks(
+            session,
+            doc_id,
+            prepared.texts,
+            prepared.contexts,
+            prepared.embeddings,
+            is_career_page,
+            now,
+            doc_title=title,
+        )
+        return len(prepared.texts)
+
+    @staticmethod
+    async def indexed_content_hashes(session, content_hashes: Iterable[str]) -> set[str]:
+        """Content hashes that already belong to a chunked document."""
+        hashes = sorted(set(content_hashes))
+        if not hashes:
+            return set()
+        result = await session.execute(
+            sa_text(
+                """
+                SELECT DISTINCT d.content_hash
+                FROM documents d
+                WHERE d.content_hash = ANY(:hashes)
+                  AND EXISTS (SELECT 1 FROM chunks c WHERE c.doc_id = d.doc_id)
+                """
+            ),
+            {"hashes": hashes},
+        )
+        return {str(row[0]) for row in result.all()}
+
+    @staticmethod
+    async def _copy_chunks(
+        session,
+        doc_id,
+        chunk_texts: list[str],
+        contexts: list[str],
+        embeddings: list[list[float]],
+        is_career_page: bool,
+        created_at,
+        doc_title: str | None = None,
+    ) -> None:
+        """
+        Bulk-load chunk rows with COPY on the session's own asyncpg connection
+        (same transaction/savepoint as the ORM work). db_client always builds
+        the engine on asyncpg.
+
+        Text format rather than copy_records_to_table: binary COPY needs a
+        halfvec codec on the connection, and registering pgvector's codec
+        breaks SQLAlchemy's text-based HALFVEC binds on the same pooled
+        connection.
+        """
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        driver_conn = raw.driver_connection
+
+        doc_field = str(doc_id)
+        career_field = "t" if is_career_page else "f"
+        created_field = str(created_at)
+        # Feeds the generated chunks.search_tsv (title + text FTS vector).
+        title_field = _copy_text_field(doc_title or None)
+        rows: list[str] = []
         for idx, (chunk_text, vec) in enumerate(zip(chunk_texts, embeddings)):
-            session.add(
-                Chunk(
-                    doc_id=doc_id,
-                    chunk_id=idx,
-                    text=chunk_text,
-                    context=(contexts[idx] if contexts else None) or None,
-                    embedding=vec,
-                    token_count=None,
-                    created_at=now,
+            context = (contexts[idx] if contexts else None) or None
+            rows.append(
+                "\t".join(
+                    (
+                        doc_field,
+                        str(idx),
+                        _copy_text_field(chunk_text),
+                        _copy_text_field(context),
+                        "[" + ",".join(map(str, vec)) + "]",
+                        career_field,
+                        "\\N",
+                        created_field,
+                        title_field,
+                    )
                 )
+                + "\n"
             )
-        await session.flush()
-        return len(chunk_texts)
+        await driver_conn.copy_to_table(
+            "chunks",
+            # A bytes source would be taken as a file path; wrap it as a file.
+            source=io.BytesIO("".join(rows).encode("utf-8")),
+            columns=_CHUNK_COPY_COLUMNS,
+            format="text",
+        )
+
+    @staticmethod
+    def _is_career_home_url(canonical_url: str) -> bool:
+        """Mirror of the retrieval filter `canonical_url ~ '/carreras/[^/]+$'`."""
+        return bool(_CAREER_HOME_URL_RE.search(canonical_url or ""))
 
     @staticmethod
     def _canonicalize_url(raw_url: str) -> str:
@@ -335,12 +535,13 @@ class IngestionService:
         return "\n".join(cleaned).strip()
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _slug_to_program_name(slug: str) -> str:
         value = (slug or "").strip().strip("/")
         if not value:
             return ""
         value = value.replace("-", " ")
-        value = re.sub(r"\s+", " ", value).strip()
+        value = " ".join(value.split())
         words: list[str] = []
         for w in value.split(" "):
             lw = w.lower()
@@ -353,17 +554,19 @@ class IngestionService:
         return " ".join(words).strip()
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _normalize_program_name(value: str) -> str:
         text = (value or "").strip()
         if not text:
             return ""
         text = re.sub(r"^\s*lic\.?\s+en\s+", "Licenciatura en ", text, flags=re.IGNORECASE)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = " ".join(text.split())
         return text
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _is_plausible_program_name(value: str) -> bool:
-        text = re.sub(r"\s+", " ", (value or "").strip())
+        text = " ".join((value or "").split())
         if not text:
             return False
         if len(text) < 4 or len(text) > 90:
@@ -403,24 +606,13 @@ class IngestionService:
                     return normalized
 
         # Conservative fallback: use title-only matches to avoid noisy extraction from long body text.
-        low_title = re.sub(r"\s+", " ", (title or "").strip().lower())
+        low_title = " ".join((title or "").lower().split())
         if any(
             tok in low_title
             for tok in ("programa", "analitico", "cohorte", "curso", "jornada", "semillero", "ofertas acad")
         ):
             return ""
-        pattern = re.compile(
-            r"\b("
-            r"medicina|"
-            r"lic\.?\s+en\s+[a-záéíóúñü\s]+|"
-            r"licenciatura\s+en\s+[a-záéíóúñü\s]+|"
-            r"tecnicatura\s+en\s+[a-záéíóúñü\s]+|"
-            r"doctorado\s+en\s+[a-záéíóúñü\s]+|"
-            r"especializaci[oó]n\s+en\s+[a-záéíóúñü\s]+"
-            r")\b",
-            flags=re.IGNORECASE,
-        )
-        match = pattern.search(low_title)
+        match = _PROGRAM_NAME_TITLE_RE.search(low_title)
         if not match:
             return ""
         candidate = IngestionService._normalize_program_name(match.group(1))
@@ -429,15 +621,15 @@ class IngestionService:
     @staticmethod
     def _extract_fact_matches(
         content: str,
-        patterns: list[str],
+        patterns: Iterable[re.Pattern[str]],
         max_len: int = 120,
     ) -> list[str]:
         found: list[str] = []
         seen: set[str] = set()
         for pattern in patterns:
-            for m in re.finditer(pattern, content, flags=re.IGNORECASE):
+            for m in pattern.finditer(content):
                 value = (m.group(1) or "").strip(" .:-\t")
-                value = re.sub(r"\s+", " ", value).strip()
+                value = " ".join(value.split())
                 if not value or len(value) > max_len:
                     continue
                 key = value.lower()
@@ -449,7 +641,7 @@ class IngestionService:
 
     @staticmethod
     def _is_plausible_authority_person_name(value: str) -> bool:
-        raw = re.sub(r"\s+", " ", (value or "").strip())
+        raw = " ".join((value or "").split())
         if not raw:
             return False
         low = raw.lower()
@@ -593,19 +785,9 @@ class IngestionService:
             block = IngestionService._slice_year_block(content, year_num)
             if not block:
                 continue
-            subjects = IngestionService._extract_fact_matches(
-                block,
-                [
-                    r"(?:^|\n)\s*materia\s*:\s*([^\n]{3,120})",
-                    r"(?:^|\n)\s*materia\s*:\s*\n+\s*([^\n]{3,120})",
-                    r"(?:^|\n)\s*asignatura\s*:\s*([^\n]{3,120})",
-                    r"(?:^|\n)\s*asignatura\s*:\s*\n+\s*([^\n]{3,120})",
-                    r"(?:^|\n)\s*-\s*([A-ZÁÉÍÓÚÑÜ][A-ZÁÉÍÓÚÑÜ0-9\s\-/]{3,120})\s*(?:\n|$)",
-                    r"(?:^|\n)\s*([A-ZÁÉÍÓÚÑÜ][A-Za-zÁÉÍÓÚÑÜáéíóúñü0-9\s().,\-/]{3,120})\s*\|",
-                ],
-            )
+            subjects = IngestionService._extract_fact_matches(block, _YEAR_SUBJECT_PATTERNS)
             for subject in subjects:
-                clean_subject = re.sub(r"\s+", " ", subject).strip(" .:-\t")
+                clean_subject = " ".join(subject.split()).strip(" .:-\t")
                 if not clean_subject:
                     continue
                 if not IngestionService._is_plausible_subject_name(clean_subject):
@@ -637,10 +819,6 @@ class IngestionService:
             return []
         out: list[str] = []
         seen: set[str] = set()
-        title_token = re.compile(
-            r"\b(?:prof\.?|dr\.?|dra\.?|lic\.?|mgter\.?|mgtr\.?|mg\.?|esp\.?|msc\.?)\b",
-            flags=re.IGNORECASE,
-        )
         scan_lines = lines if max_scan_lines <= 0 else lines[:max_scan_lines]
         for raw in scan_lines:
             line = (raw or "").strip()
@@ -649,13 +827,13 @@ class IngestionService:
             line = re.sub(r"^\s*[-*>\d.)#\s_`]+", "", line)
             line = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", line)
             line = re.sub(r"[*_`]+", "", line)
-            line = re.sub(r"\s+", " ", line).strip(" .:-\t")
+            line = " ".join(line.split()).strip(" .:-\t")
             if not line or len(line) > 120:
                 continue
             low = line.lower()
             if any(tok in low for tok in ("@", "http://", "https://", "cuerpo docente", "plan de estudios")):
                 continue
-            if not title_token.search(line):
+            if not _TITLED_PERSON_RE.search(line):
                 continue
             if not IngestionService._is_plausible_authority_person_name(line):
                 continue
@@ -718,6 +896,12 @@ class IngestionService:
 
     @staticmethod
     def _extract_program_facts(url: str, title: str, content: str, page_type: str = "") -> list[dict]:
+        low_url = (url or "").lower()
+        is_canonical_career = "/carreras/" in low_url
+        canonical_root = bool(
+            re.search(r"/carreras/[^/]+/?$", low_url)
+            or re.search(r"/oferta-academica/[^/]+/?$", low_url)
+        )
         program_name = IngestionService._extract_program_name(url, title, content)
         if not program_name:
             program_name = "__general__"
@@ -735,47 +919,25 @@ class IngestionService:
                     "fact_key": "program_name",
                     "fact_value": program_name,
                     "evidence_text": title[:200] if title else program_name,
-                    "confidence": 0.95 if "/carreras/" in (url or "").lower() else 0.85,
+                    "confidence": 0.95 if is_canonical_career else 0.85,
                 }
             )
 
         # High-confidence patterns: explicitly say "director/a de carrera", "dirección de carrera",
         # "coordinador/a de carrera", or "responsable de carrera" — not bare "responsable".
-        director_matches_high = IngestionService._extract_fact_matches(
-            content,
-            [
-                r"(?:director(?:a)?\s+de\s+carrera|direcci[oó]n\s+de\s+carrera|coordinador(?:a)?\s+de\s+carrera|responsable\s+de\s+carrera)\s*[:\-]\s*([^\n|]{3,120})",
-                r"(?:director(?:a)?\s+de\s+(?:la\s+)?carrera(?:\s+de)?[^\n:|]{0,90}?)\s+(?:es\s+)?([A-ZÁÉÍÓÚÑ][^\n|]{3,120})",
-                r"\|\s*(?:director(?:a)?\s+de\s+carrera|direcci[oó]n\s+de\s+carrera|coordinador(?:a)?\s+de\s+carrera)\s*\|\s*([^\|\n]{3,120})\|",
-                r"(?:^|\n)\s*#{1,6}\s*(?:director(?:a)?|direcci[oó]n)(?:\s+de\s+carrera)[^\n]*\n+\s*([^\n|]{3,120})",
-                r"(?:^|\n)\s*(?:director(?:a)?|direcci[oó]n)(?:\s+de\s+carrera)[^\n]*\n+\s*([^\n|]{3,120})",
-            ],
-        )
+        director_matches_high = IngestionService._extract_fact_matches(content, _DIRECTOR_HIGH_PATTERNS)
         # Lower-confidence fallback: generic "director", "coordinador" without "de carrera".
         # Bare "responsable" is intentionally excluded — it captures unrelated roles (e.g. diplomas).
         seen_high = {m.lower() for m in director_matches_high}
-        director_matches_low = IngestionService._extract_fact_matches(
-            content,
-            [
-                r"(?:director(?:a)?|coordinador(?:a)?|jef(?:e|a)\s+de\s+carrera)\s*[:\-]\s*([^\n|]{3,120})",
-                r"\|\s*(?:director(?:a)?|coordinador(?:a)?)\s*\|\s*([^\|\n]{3,120})\|",
-                r"(?:^|\n)\s*#{1,6}\s*(?:director(?:a)?|coordinador(?:a)?)[^\n]*\n+\s*([^\n|]{3,120})",
-                r"(?:^|\n)\s*(?:director(?:a)?|coordinador(?:a)?)[^\n]*\n+\s*([^\n|]{3,120})",
-            ],
-        )
+        director_matches_low = IngestionService._extract_fact_matches(content, _DIRECTOR_LOW_PATTERNS)
         director_matches_low = [m for m in director_matches_low if m.lower() not in seen_high]
 
-        if is_program_page and not director_matches_high and not director_matches_low:
-            canonical_root = bool(
-                re.search(r"/carreras/[^/]+/?$", (url or "").lower())
-                or re.search(r"/oferta-academica/[^/]+/?$", (url or "").lower())
-            )
-            if canonical_root:
-                titled = IngestionService._extract_titled_person_lines(content)
-                if titled:
-                    director_matches_high = [titled[0]]
+        if is_program_page and canonical_root and not director_matches_high and not director_matches_low:
+            titled = IngestionService._extract_titled_person_lines(content)
+            if titled:
+                director_matches_high = [titled[0]]
         if is_program_page:
-            base_conf = 0.95 if "/carreras/" in (url or "").lower() else 0.82
+            base_conf = 0.95 if is_canonical_career else 0.82
             for match in director_matches_high:
                 if not IngestionService._is_plausible_authority_person_name(match):
                     continue
@@ -787,7 +949,7 @@ class IngestionService:
                         "confidence": base_conf,
                     }
                 )
-            low_conf = 0.75 if "/carreras/" in (url or "").lower() else 0.6
+            low_conf = 0.75 if is_canonical_career else 0.6
             for match in director_matches_low:
                 if not IngestionService._is_plausible_authority_person_name(match):
                     continue
@@ -800,25 +962,11 @@ class IngestionService:
                     }
                 )
 
-        secretary_matches = IngestionService._extract_fact_matches(
-            content,
-            [
-                r"(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*[:\-]\s*([^\n|]{3,120})",
-                r"(?:secretar[ií]a\s+acad[eé]mica|coordinaci[oó]n\s+acad[eé]mica)\s*[:\-]\s*([^\n|]{3,120})",
-                r"\|\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\|\s*([^\|\n]{3,120})\|",
-                r"(?:^|\n)\s*#{1,6}\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\n+\s*([^\n|]{3,120})",
-                r"(?:^|\n)\s*(?:secretario(?:a)?\s+acad[eé]mic[oa])\s*\n+\s*([^\n|]{3,120})",
-            ],
-        )
-        if is_program_page and not secretary_matches:
-            canonical_root = bool(
-                re.search(r"/carreras/[^/]+/?$", (url or "").lower())
-                or re.search(r"/oferta-academica/[^/]+/?$", (url or "").lower())
-            )
-            if canonical_root:
-                titled = IngestionService._extract_titled_person_lines(content)
-                if len(titled) >= 2:
-                    secretary_matches = [titled[1]]
+        secretary_matches = IngestionService._extract_fact_matches(content, _SECRETARY_PATTERNS)
+        if is_program_page and canonical_root and not secretary_matches:
+            titled = IngestionService._extract_titled_person_lines(content)
+            if len(titled) >= 2:
+                secretary_matches = [titled[1]]
         if is_program_page:
             for match in secretary_matches:
                 if not IngestionService._is_plausible_authority_person_name(match):
@@ -828,18 +976,11 @@ class IngestionService:
                         "fact_key": "secretary_academic",
                         "fact_value": match,
                         "evidence_text": match,
-                        "confidence": 0.85 if "/carreras/" in (url or "").lower() else 0.7,
+                        "confidence": 0.85 if is_canonical_career else 0.7,
                     }
                 )
 
-        duration_matches = IngestionService._extract_fact_matches(
-            content,
-            [
-                r"(?:duraci[oó]n(?:\s+de\s+la\s+carrera)?|duraci[oó]n)\s*[:\-]\s*([^\n]{2,80})",
-                r"(?:duraci[oó]n[^\n]{0,30})(\d+\s*(?:a[nñ]os|años)(?:\s+y\s+\d+\s*(?:meses|mes))?)",
-            ],
-            max_len=80,
-        )
+        duration_matches = IngestionService._extract_fact_matches(content, _DURATION_PATTERNS, max_len=80)
         if is_program_page:
             for match in duration_matches:
                 if not IngestionService._is_duration_value_plausible(match):
@@ -849,7 +990,7 @@ class IngestionService:
                         "fact_key": "duration",
                         "fact_value": match,
                         "evidence_text": match,
-                        "confidence": 0.88 if "/carreras/" in (url or "").lower() else 0.72,
+                        "confidence": 0.88 if is_canonical_career else 0.72,
                     }
                 )
 
@@ -858,18 +999,18 @@ class IngestionService:
 
         return facts
 
-    async def process_and_save(
+    def prepare_page(
         self,
         url: str,
         title: str,
         content: str,
-        session,
-        page_type: str = "institutional_info",
-        content_type: str = "html",
-        authority_score: float = 0.5,
-        original_filename: str | None = None,
         allowed_host_exact: str | None = None,
-    ):
+    ) -> dict:
+        """
+        Database-free checks of process_and_save: host, cleaning and content
+        filters. Returns the rejection ({"saved": False, "reason": ...}) or
+        {"ok": True, "canonical_url", "clean_content", "content_hash"}.
+        """
         raw_parsed_url = urlparse((url or "").strip())
         raw_host_exact = normalize_host_exact(raw_parsed_url.netloc or raw_parsed_url.hostname or "")
         expected_host_exact = normalize_host_exact(allowed_host_exact or "")
@@ -889,7 +1030,37 @@ class IngestionService:
         if not should_index:
             return {"saved": False, "reason": filter_reason}
 
-        doc_hash = hashlib.sha256(clean_content.encode("utf-8")).hexdigest()
+        return {
+            "ok": True,
+            "canonical_url": canonical_url,
+            "clean_content": clean_content,
+            "content_hash": hashlib.sha256(clean_content.encode("utf-8")).hexdigest(),
+        }
+
+    async def process_and_save(
+        self,
+        url: str,
+        title: str,
+        content: str,
+        session,
+        page_type: str = "institutional_info",
+        content_type: str = "html",
+        authority_score: float = 0.5,
+        original_filename: str | None = None,
+        allowed_host_exact: str | None = None,
+        autocommit: bool = True,
+        prepared_chunks: PreparedChunks | None = None,
+    ):
+        # autocommit=False leaves the transaction open (changes are only
+        # flushed) so the caller can commit a batch of pages at once.
+        # prepared_chunks comes from prepare_chunks() on the same content,
+        # computed before the caller opened its transaction.
+        page = self.prepare_page(url, title, content, allowed_host_exact=allowed_host_exact)
+        if not page.get("ok"):
+            return page
+        canonical_url = page["canonical_url"]
+        clean_content = page["clean_content"]
+        doc_hash = page["content_hash"]
 
         parsed_url = urlparse(canonical_url)
         domain = normalize_domain(parsed_url.netloc)
@@ -916,7 +1087,10 @@ class IngestionService:
             )
             if int(chunk_count_row.scalar() or 0) > 0:
                 existing_doc.fetched_at = utc_now_naive()
-                await session.commit()
+                if autocommit:
+                    await session.commit()
+                else:
+                    await session.flush()
                 return {"saved": False, "reason": "duplicate_content"}
 
         existing_same_hash = await session.execute(
@@ -965,7 +1139,9 @@ class IngestionService:
         await session.flush()
 
         try:
-            await self._replace_chunks_for_doc(session, doc.doc_id, clean_content)
+            await self._replace_chunks_for_doc(
+                session, doc.doc_id, clean_content, canonical_url, prepared=prepared_chunks, title=title
+            )
         except Exception:
             logger.exception("Failed to embed chunks for %s", canonical_url)
             raise
@@ -976,6 +1152,8 @@ class IngestionService:
             .where(ProgramFact.canonical_url == canonical_url)
         )
         if self._is_fact_source_url(canonical_url, page_type):
+            # Same (url, title, content) for every fact of the page: resolve lazily, once.
+            page_program_name: str | None = None
             for fact in self._extract_program_facts(
                 canonical_url,
                 title or "",
@@ -983,15 +1161,14 @@ class IngestionService:
                 page_type=page_type,
             ):
                 fact_key = str(fact.get("fact_key"))
-                derived_program_name = (
-                    str(fact.get("program_name") or "").strip()
-                    or (
-                        str(fact.get("fact_value") or "").strip()
-                        if fact_key == "program_name"
-                        else self._extract_program_name(canonical_url, title or "", clean_content)
-                    )
-                    or "__general__"
-                )
+                derived_program_name = str(fact.get("program_name") or "").strip()
+                if not derived_program_name and fact_key == "program_name":
+                    derived_program_name = str(fact.get("fact_value") or "").strip()
+                elif not derived_program_name:
+                    if page_program_name is None:
+                        page_program_name = self._extract_program_name(canonical_url, title or "", clean_content)
+                    derived_program_name = page_program_name
+                derived_program_name = derived_program_name or "__general__"
                 session.add(
                     ProgramFact(
                         source_id=source.source_id,
@@ -1003,7 +1180,10 @@ class IngestionService:
                         confidence=float(fact.get("confidence") or 0.7),
                     )
                 )
-        await session.commit()
+        if autocommit:
+            await session.commit()
+        else:
+            await session.flush()
         return {"saved": True, "reason": "saved" if existing_doc is None else "updated"}
 
     async def process_pdf_and_save(
@@ -1017,12 +1197,14 @@ class IngestionService:
         original_filename: str | None = None,
         pdf_metadata: dict | None = None,
         allowed_host_exact: str | None = None,
+        autocommit: bool = True,
     ):
         """
         Ingest a PDF document that has already been converted to markdown.
 
         Delegates to process_and_save with content_type="pdf" and adds
-        any PDF-specific metadata to chunk metadata.
+        any PDF-specific metadata to chunk metadata. With autocommit=False
+        the caller owns the commit, same as process_and_save.
         """
         return await self.process_and_save(
             url=url,
@@ -1034,4 +1216,5 @@ class IngestionService:
             authority_score=authority_score,
             original_filename=original_filename,
             allowed_host_exact=allowed_host_exact,
+            autocommit=autocommit,
         )
@@ -242,7 +242,7 @@ class PageClassifier:
             return base
 
         # Boost authority if content has strong academic signals
-        content_lc = (content or "").lower()[:3000]
+        content_lc = (content or "")[:3000].lower()
         title_lc = (title or "").lower()
         haystack = f"{url.lower()} {title_lc} {content_lc}"
 
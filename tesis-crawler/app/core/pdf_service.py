@@ -50,6 +50,16 @@ class PDFService:
     HEADING_FONT_THRESHOLD: float = 14.0  # Points; text larger than this is treated as heading
     MIN_TEXT_LENGTH: int = 50  # Minimum chars for a PDF to be considered valid
 
+    # PDFs in a crawl come from one or two institutional hosts: keep one pool
+    # alive across downloads so each PDF skips DNS + TCP/TLS setup.
+    DOWNLOAD_MAX_CONNECTIONS: int = 20
+    DOWNLOAD_MAX_KEEPALIVE: int = 10
+    DOWNLOAD_KEEPALIVE_EXPIRY_S: float = 30.0
+
+    def __init__(self):
+        self._http: httpx.AsyncClient | None = None
+        self._http_lock = asyncio.Lock()
+
     # ── Public API ───────────────────────────────────────────────────────
 
     async def download_and_convert(self, url: str) -> Optional[PDFResult]:
@@ -91,42 +101,62 @@ class PDFService:
         tasks = [_limited(u) for u in urls]
         return list(await asyncio.gather(*tasks, return_exceptions=False))
 
+    async def aclose(self) -> None:
+        """Release the download pool. The next download opens a new one."""
+        async with self._http_lock:
+            http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+
     # ── Private helpers ──────────────────────────────────────────────────
 
+    async def _client(self) -> httpx.AsyncClient:
+        if self._http is not None:
+            return self._http
+        async with self._http_lock:
+            if self._http is None:
+                self._http = httpx.AsyncClient(
+                    follow_redirects=True,
+                    timeout=httpx.Timeout(self.DOWNLOAD_TIMEOUT),
+                    limits=httpx.Limits(
+                        max_connections=self.DOWNLOAD_MAX_CONNECTIONS,
+                        max_keepalive_connections=self.DOWNLOAD_MAX_KEEPALIVE,
+                        keepalive_expiry=self.DOWNLOAD_KEEPALIVE_EXPIRY_S,
+                    ),
+                    verify=False,  # Institutional sites sometimes have bad SSL
+                )
+            return self._http
+
     async def _download_pdf(self, url: str) -> Optional[bytes]:
         """Download PDF bytes, respecting size limits."""
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                timeout=httpx.Timeout(self.DOWNLOAD_TIMEOUT),
-                verify=False,  # Institutional sites sometimes have bad SSL
-            ) as client:
-                # HEAD request to check size first
-                try:
-                    head = await client.head(url)
-                    content_length = int(head.headers.get("content-length", 0))
-                    if content_length > self.MAX_PDF_SIZE:
-                        logger.warning("PDF too large (%d bytes): %s", content_length, url)
-                        return None
-                except (httpx.HTTPError, ValueError):
-                    pass  # Proceed anyway; some servers don't support HEAD
-
-                response = await client.get(url)
-                response.raise_for_status()
-
-                content_type = (response.headers.get("content-type") or "").lower()
-                if "pdf" not in content_type and not url.lower().endswith(".pdf"):
-                    logger.warning("URL does not return PDF content-type: %s (%s)", url, content_type)
+            client = await self._client()
+            # HEAD request to check size first
+            try:
+                head = await client.head(url)
+                content_length = int(head.headers.get("content-length", 0))
+                if content_length > self.MAX_PDF_SIZE:
+                    logger.warning("PDF too large (%d bytes): %s", content_length, url)
                     return None
+            except (httpx.HTTPError, ValueError):
+                pass  # Proceed anyway; some servers don't support HEAD
 
-                if len(response.content) > self.MAX_PDF_SIZE:
-                    logger.warning("PDF exceeds size limit after download: %s", url)
-                    return None
-                if len(response.content) > self.MAX_DOC_SIZE:
-                    logger.info("PDF skipped by doc-size limit (%d bytes): %s", len(response.content), url)
-                    return None
+            response = await client.get(url)
+            response.raise_for_status()
+
+            content_type = (response.headers.get("content-type") or "").lower()
+            if "pdf" not in content_type and not url.lower().endswith(".pdf"):
+                logger.warning("URL does not return PDF content-type: %s (%s)", url, content_type)
+                return None
+
+            if len(response.content) > self.MAX_PDF_SIZE:
+                logger.warning("PDF exceeds size limit after download: %s", url)
+                return None
+            if len(response.content) > self.MAX_DOC_SIZE:
+                logger.info("PDF skipped by doc-size limit (%d bytes): %s", len(response.content), url)
+                return None
 
-                return response.content
+            return response.content
         except httpx.HTTPStatusError as exc:
             logger.warning("HTTP %d for PDF: %s", exc.response.status_code, url)
             return None
@@ -285,7 +315,7 @@ class PDFService:
         """Convert a filename like 'plan-de-estudios-medicina.pdf' to a readable title."""
         name = filename.rsplit(".", 1)[0] if "." in filename else filename
         name = name.replace("-", " ").replace("_", " ")
-        name = re.sub(r"\s+", " ", name).strip()
+        name = " ".join(name.split())
         if name:
             return name.title()
         return ""
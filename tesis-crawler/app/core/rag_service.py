@@ -14,15 +14,24 @@ y borrados en Etapa 5 — el git log preserva las versiones anteriores.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from typing import Any, Dict, List, TypedDict
 from uuid import UUID
 
 from langgraph.graph import END, StateGraph
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from openai import AsyncOpenAI
-from sqlalchemy import text
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import bindparam, text
 
 from app.config import settings
 from app.core.domain_utils import domain_variants, normalize_domain
@@ -44,9 +53,141 @@ logger = logging.getLogger(__name__)
 EMBEDDING_MODEL = "text-embedding-3-large"
 
 
-def _vec_to_pg_literal(vec) -> str:
-    """Format a Python sequence as a pgvector literal: '[0.1,0.2,...]'."""
-    return "[" + ",".join(f"{float(x):.7f}" for x in vec) + "]"
+# Markers of an answer that already declined or asked for clarification.
+# Compiled once into a single alternation so verify() scans the response in
+# one pass instead of one substring search per marker.
+_NO_INFO_MARKERS = (
+    "no tengo información",
+    "no tengo informacion",
+    "no encontré",
+    "no encontre",
+    "no llegué a",
+    "no llegue a",
+    "para responder bien",
+    "decime la carrera",
+    "decime primero la carrera",
+    "podés reformular",
+    "podes reformular",
+    "podrías especificar",
+    "podrias especificar",
+    "podrías indicar",
+    "podrias indicar",
+    "necesito más detalles",
+    "necesito mas detalles",
+    "necesitaría que aclares",
+    "necesitaria que aclares",
+    "no puedo brindar información",
+    "no puedo brindar informacion",
+    "no puedo proporcionar",
+    "lamentablemente no",
+    "lo siento, pero no",
+)
+_NO_INFO_MARKERS_RE = re.compile("|".join(map(re.escape, _NO_INFO_MARKERS)), re.IGNORECASE)
+
+
+# Retrieval SQL, built once at import so SQLAlchemy reuses the same
+# statement objects (and their compiled-cache entries) across requests.
+_SOURCE_DOMAIN_STMT = text(
+    """
+    SELECT s.domain AS domain
+    FROM sources s
+    WHERE s.source_id = CAST(:source_id AS uuid)
+    LIMIT 1
+    """
+)
+
+# Dense (pgvector cosine) + sparse (FTS spanish), both joining
+# chunks → documents → sources. We pull text + (Stage 2) context column
+# so the reranker scores the situated chunk and the LLM sees the same.
+_DENSE_STMT = text(
+    """
+    SELECT
+      c.id::text AS cid,
+      d.canonical_url AS url,
+      COALESCE(d.title, '') AS title,
+      c.text AS chunk_text,
+      COALESCE(c.context, '') AS chunk_context,
+      d.fetched_at AS fetched_at
+    FROM chunks c
+    JOIN documents d ON d.doc_id = c.doc_id
+    JOIN sources s ON s.source_id = d.source_id
+    WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
+      AND c.embedding IS NOT NULL
+    ORDER BY c.embedding <=> :query_vec
+    LIMIT :k
+    """
+).bindparams(bindparam("query_vec", type_=HALFVEC(EMBEDDING_DIM)))
+_FTS_STMT = text(
+    """
+    SELECT
+      c.id::text AS cid,
+      d.canonical_url AS url,
+      COALESCE(d.title, '') AS title,
+      c.text AS chunk_text,
+      COALESCE(c.context, '') AS chunk_context,
+      d.fetched_at AS fetched_at
+    FROM chunks c
+    JOIN documents d ON d.doc_id = c.doc_id
+    JOIN sources s ON s.source_id = d.source_id
+    CROSS JOIN websearch_to_tsquery('spanish', :q) AS tsq
+    WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
+      AND c.search_tsv @@ tsq
+    ORDER BY ts_rank(c.search_tsv, tsq) DESC
+    LIMIT :k
+    """
+)
+
+# Stage 6: a parallel dense lookup scoped to canonical /carreras/ pages.
+# Without this the embedder can miss the carrera-home chunks (heavy
+# boilerplate / TOC), and queries like "es presencial Medicina?",
+# "duración Enfermería", "quién es la decana?" land on tangential pages
+# and the model either declines or hallucinates names.
+_CAREER_DENSE_STMT = text(
+    """
+    SELECT
+      c.id::text AS cid,
+      d.canonical_url AS url,
+      COALESCE(d.title, '') AS title,
+      c.text AS chunk_text,
+      COALESCE(c.context, '') AS chunk_context,
+      d.fetched_at AS fetched_at
+    FROM chunks c
+    JOIN documents d ON d.doc_id = c.doc_id
+    JOIN sources s ON s.source_id = d.source_id
+    WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
+      AND c.is_career_page
+      AND c.embedding IS NOT NULL
+    ORDER BY c.embedding <=> :query_vec
+    LIMIT :k
+    """
+).bindparams(bindparam("query_vec", type_=HALFVEC(EMBEDDING_DIM)))
+
+_NEIGHBOR_STMT = text(
+    """
+    WITH seeds AS (
+        SELECT doc_id, chunk_id
+        FROM chunks
+        WHERE id::text = ANY(:seed_cids)
+    )
+    SELECT DISTINCT
+      c.id::text AS cid,
+      d.canonical_url AS url,
+      COALESCE(d.title, '') AS title,
+      c.text AS chunk_text,
+      COALESCE(c.context, '') AS chunk_context,
+      d.fetched_at AS fetched_at,
+      c.chunk_id
+    FROM chunks c
+    JOIN documents d ON d.doc_id = c.doc_id
+    JOIN seeds s ON s.doc_id = c.doc_id
+    WHERE ABS(c.chunk_id - s.chunk_id) <= :radius
+    ORDER BY c.chunk_id
+    """
+)
+
+# SET LOCAL does not accept bind params; set_config(..., true) is the
+# transaction-local equivalent.
+_SET_EF_SEARCH_STMT = text("SELECT set_config('hnsw.ef_search', :ef, true)")
 
 
 class AgentState(TypedDict, total=False):
@@ -81,6 +222,13 @@ class RAGService:
     # matches that come from /carreras/ URLs so the LLM sees the full year.
     NEIGHBOR_EXPANSION_RADIUS = 3
     NEIGHBOR_EXPANSION_TOP = 4
+    # HNSW candidate list per dense query. Must stay >= the LIMIT or the index
+    # scan returns fewer rows than asked (server default is 40). The
+    # /carreras/ branch walks a partial index shared by every source and
+    # filters by domain afterwards, so it needs a wider candidate list to
+    # still fill its LIMIT.
+    HNSW_EF_SEARCH = 100
+    HNSW_EF_SEARCH_FILTERED = 200
 
     # Prompt sizing
     # gpt-4o accepts ~128k tokens; staying well under that. Stage 6: bumped
@@ -103,6 +251,25 @@ class RAGService:
     # out-of-scope) we still decline.
     VERIFY_GROUNDEDNESS_THRESHOLD = 0.4
 
+    # Retrieve cache: exact (source_id, normalized query) hits first, then a
+    # per-source LRU of recent query embeddings compared by cosine. Entries
+    # expire after the TTL so re-crawled content shows up within the hour.
+    RETRIEVE_CACHE_MAX_ENTRIES = 1024
+    RETRIEVE_CACHE_TTL_SECONDS = 3600.0
+    RETRIEVE_SEMANTIC_CACHE_PER_SOURCE = 64
+    RETRIEVE_SEMANTIC_CACHE_THRESHOLD = 0.95
+    # Query embeddings are deterministic per (model, dim, text) and shared
+    # across sources, so they outlive the per-source context cache.
+    EMBED_CACHE_MAX_ENTRIES = 4096
+    EMBED_CACHE_TTL_SECONDS = 86400.0
+    # source_id → domain is effectively static; skip the lookup per request.
+    SOURCE_SCOPE_CACHE_MAX_ENTRIES = 1024
+    SOURCE_SCOPE_CACHE_TTL_SECONDS = 300.0
+    # The rewrite call is temperature=0, so (query, clipped history) maps to
+    # one answer; repeats (retries, re-asks, eval runs) skip the helper LLM.
+    REWRITE_CACHE_MAX_ENTRIES = 2048
+    REWRITE_CACHE_TTL_SECONDS = 3600.0
+
     def __init__(self):
         # Stage 5 refinement: temperature=0 for reproducibility. Without this,
         # the same query can land on "presencial" one time and "presencial y
@@ -125,6 +292,11 @@ class RAGService:
         # was too lax with out-of-scope / medical advice cases.
         self.verify_model = str(getattr(settings, "OPENAI_VERIFY_MODEL", "gpt-4o"))
         self._openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self._exact_cache: OrderedDict[tuple[str, str], tuple[float, list[str]]] = OrderedDict()
+        self._semantic_cache: dict[str, OrderedDict[str, tuple[float, list[float], list[str]]]] = {}
+        self._embed_cache: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._source_scope_cache: OrderedDict[str, tuple[float, tuple[str, str, str]]] = OrderedDict()
+        self._rewrite_cache: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
 
     # ── Public API ───────────────────────────────────────────────────────
 
@@ -157,30 +329,122 @@ class RAGService:
 
     # ── Helpers (used by the 4 nodes) ────────────────────────────────────
 
-    async def _embed_query(self, query: str) -> str:
-        """Embed the query and return a pgvector literal ready for SQL casting."""
+    async def _embed_query(self, query: str) -> list[float]:
+        """Embed the query and return the raw vector (LRU-cached with a TTL)."""
+        key = hashlib.sha1(
+            f"{EMBEDDING_MODEL}:{EMBEDDING_DIM}:{self._cache_key_query(query)}".encode()
+        ).hexdigest()
+        hit = self._embed_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] <= self.EMBED_CACHE_TTL_SECONDS:
+            self._embed_cache.move_to_end(key)
+            return hit[1]
+
         vec = await self.embedder.aembed_query(query or "")
-        return _vec_to_pg_literal(vec)
+        self._embed_cache[key] = (time.monotonic(), vec)
+        self._embed_cache.move_to_end(key)
+        while len(self._embed_cache) > self.EMBED_CACHE_MAX_ENTRIES:
+            self._embed_cache.popitem(last=False)
+        return vec
+
+    @staticmethod
+    def _cache_key_query(query: str) -> str:
+        return " ".join((query or "").lower().split())
+
+    @staticmethod
+    def _unit_vector(vec: list[float]) -> list[float]:
+        norm = math.sqrt(math.sumprod(vec, vec))
+        if not norm:
+            return list(vec)
+        return [x / norm for x in vec]
+
+    def _cached_context_exact(self, source_id: str, key_query: str) -> list[str] | None:
+        key = (source_id, key_query)
+        hit = self._exact_cache.get(key)
+        if hit is None:
+            return None
+        stored_at, contexts = hit
+        if time.monotonic() - stored_at > self.RETRIEVE_CACHE_TTL_SECONDS:
+            self._exact_cache.pop(key, None)
+            return None
+        self._exact_cache.move_to_end(key)
+        return list(contexts)
+
+    def _cached_context_semantic(self, source_id: str, unit_vec: list[float]) -> list[str] | None:
+        entries = self._semantic_cache.get(source_id)
+        if not entries:
+            return None
+        now = time.monotonic()
+        best_key: str | None = None
+        best_score = self.RETRIEVE_SEMANTIC_CACHE_THRESHOLD
+        for key, (stored_at, cached_vec, _contexts) in list(entries.items()):
+            if now - stored_at > self.RETRIEVE_CACHE_TTL_SECONDS:
+                del entries[key]
+                continue
+            score = math.sumprod(unit_vec, cached_vec)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        entries.move_to_end(best_key)
+        return list(entries[best_key][2])
+
+    def _store_cached_context(
+        self,
+        source_id: str,
+        key_query: str,
+        unit_vec: list[float],
+        contexts: list[str],
+    ) -> None:
+        now = time.monotonic()
+        key = (source_id, key_query)
+        self._exact_cache[key] = (now, list(contexts))
+        self._exact_cache.move_to_end(key)
+        while len(self._exact_cache) > self.RETRIEVE_CACHE_MAX_ENTRIES:
+            self._exact_cache.popitem(last=False)
+
+        entries = self._semantic_cache.setdefault(source_id, OrderedDict())
+        entries[key_query] = (now, unit_vec, list(contexts))
+        entries.move_to_end(key_query)
+        while len(entries) > self.RETRIEVE_SEMANTIC_CACHE_PER_SOURCE:
+            entries.popitem(last=False)
 
     async def _resolve_source_scope(self, source_id: str) -> tuple[str, str, str] | None:
         """Return (domain_variant_1, domain_variant_2, source_url) for a given source_id."""
-        stmt = text(
-            """
-            SELECT s.domain AS domain
-            FROM sources s
-            WHERE s.source_id = CAST(:source_id AS uuid)
-            LIMIT 1
-            """
-        )
+        hit = self._source_scope_cache.get(source_id)
+        if hit is not None and time.monotonic() - hit[0] <= self.SOURCE_SCOPE_CACHE_TTL_SECONDS:
+            self._source_scope_cache.move_to_end(source_id)
+            return hit[1]
+
         async with async_session() as session:
-            row = (await session.execute(stmt, {"source_id": source_id})).mappings().first()
+            row = (await session.execute(_SOURCE_DOMAIN_STMT, {"source_id": source_id})).mappings().first()
         if not row:
             return None
         domain = normalize_domain((row.get("domain") or "").strip().lower())
         if not domain:
             return None
         variants = sorted(domain_variants(domain))
-        return variants[0], variants[1], f"https://{domain}/"
+        scope = (variants[0], variants[1], f"https://{domain}/")
+        # Only resolved scopes are cached so a newly created source is seen at once.
+        self._source_scope_cache[source_id] = (time.monotonic(), scope)
+        self._source_scope_cache.move_to_end(source_id)
+        while len(self._source_scope_cache) > self.SOURCE_SCOPE_CACHE_MAX_ENTRIES:
+            self._source_scope_cache.popitem(last=False)
+        return scope
+
+    @staticmethod
+    async def _set_hnsw_ef_search(session, ef_search: int) -> None:
+        """Transaction-local hnsw.ef_search (SET LOCAL does not accept bind params)."""
+        await session.execute(
+            _SET_EF_SEARCH_STMT,
+            {"ef": str(int(ef_search))},
+        )
+
+    async def _fetch_rows(self, stmt, params: dict, ef_search: int | None = None) -> list:
+        """Run one read on its own session. ef_search is set for that transaction only."""
+        async with async_session() as session:
+            if ef_search is not None:
+                await self._set_hnsw_ef_search(session, ef_search)
+            return (await session.execute(stmt, params)).mappings().all()
 
     @staticmethod
     def _clip_text(value: str, max_chars: int) -> str:
@@ -217,8 +481,7 @@ class RAGService:
         for items in ranked_lists:
             for rank, item_id in enumerate(items):
                 scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (c + rank + 1)
-        ordered = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
-        return [k for k, _ in ordered[:top_n]]
+        return heapq.nlargest(top_n, scores, key=scores.__getitem__)
 
     async def _helper_json_call(
         self,
@@ -252,35 +515,7 @@ class RAGService:
         """True when the answer already declined or asked for clarification."""
         if not response:
             return True
-        low = response.lower()
-        markers = (
-            "no tengo información",
-            "no tengo informacion",
-            "no encontré",
-            "no encontre",
-            "no llegué a",
-            "no llegue a",
-            "para responder bien",
-            "decime la carrera",
-            "decime primero la carrera",
-            "podés reformular",
-            "podes reformular",
-            "podrías especificar",
-            "podrias especificar",
-            "podrías indicar",
-            "podrias indicar",
-            "necesito más detalles",
-            "necesito mas detalles",
-            "necesitaría que aclares",
-            "necesitaria que aclares",
-            "no puedo brindar información",
-            "no puedo brindar informacion",
-            "no puedo proporcionar",
-            "lamentablemente no",
-            "lo siento, pero no",
-            RAGService.NO_INFO_RESPONSE.lower(),
-        )
-        return any(m in low for m in markers)
+        return _NO_INFO_MARKERS_RE.search(response) is not None
 
     # ── Graph nodes ──────────────────────────────────────────────────────
 
@@ -298,6 +533,12 @@ class RAGService:
         if len(joined_history) > self.REWRITE_HISTORY_MAX_CHARS:
             joined_history = joined_history[-self.REWRITE_HISTORY_MAX_CHARS :]
 
+        cache_key = (query, joined_history)
+        hit = self._rewrite_cache.get(cache_key)
+        if hit is not None and time.monotonic() - hit[0] <= self.REWRITE_CACHE_TTL_SECONDS:
+            self._rewrite_cache.move_to_end(cache_key)
+            return {"resolved_query": hit[1]}
+
         payload = await self._helper_json_call(
             REWRITE_QUERY_SYSTEM,
             REWRITE_QUERY_USER.format(history=joined_history, current=query),
@@ -305,9 +546,14 @@ class RAGService:
         )
         rewritten = (payload.get("query") or "").strip()
         if not rewritten:
+            # Not cached: an empty payload is usually a failed helper call.
             return {"resolved_query": query}
         if len(rewritten) > 400:
             rewritten = rewritten[:400].rsplit(" ", 1)[0]
+        self._rewrite_cache[cache_key] = (time.monotonic(), rewritten)
+        self._rewrite_cache.move_to_end(cache_key)
+        while len(self._rewrite_cache) > self.REWRITE_CACHE_MAX_ENTRIES:
+            self._rewrite_cache.popitem(last=False)
         return {"resolved_query": rewritten}
 
     async def retrieve(self, state: AgentState):
@@ -321,134 +567,88 @@ class RAGService:
         except ValueError:
             return {"context": []}
 
+        key_query = self._cache_key_query(query)
+        cached = self._cached_context_exact(source_id, key_query)
+        if cached is not None:
+            return {"context": cached}
+
         scope = await self._resolve_source_scope(source_id)
         if not scope:
             return {"context": []}
         domain_1, domain_2, _source_url = scope
 
         try:
-            query_vec = await self._embed_query(query)
+            embedding = await self._embed_query(query)
         except Exception:
             logger.exception("Embedding query failed")
             return {"context": []}
 
-        # Dense (pgvector cosine) + sparse (FTS spanish), both joining
-        # chunks → documents → sources. We pull text + (Stage 2) context column
-        # so the reranker scores the situated chunk and the LLM sees the same.
-        vector_sql = text(
-            """
-            SELECT
-              c.id::text AS cid,
-              d.canonical_url AS url,
-              COALESCE(d.title, '') AS title,
-              c.text AS chunk_text,
-              COALESCE(c.context, '') AS chunk_context,
-              d.fetched_at AS fetched_at
-            FROM chunks c
-            JOIN documents d ON d.doc_id = c.doc_id
-            JOIN sources s ON s.source_id = d.source_id
-            WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
-              AND c.embedding IS NOT NULL
-            ORDER BY c.embedding <=> CAST(:query_vec AS vector)
-            LIMIT :k
-            """
-        )
-        fts_sql = text(
-            """
-            SELECT
-              c.id::text AS cid,
-              d.canonical_url AS url,
-              COALESCE(d.title, '') AS title,
-              c.text AS chunk_text,
-              COALESCE(c.context, '') AS chunk_context,
-              d.fetched_at AS fetched_at
-            FROM chunks c
-            JOIN documents d ON d.doc_id = c.doc_id
-            JOIN sources s ON s.source_id = d.source_id
-            WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
-              AND to_tsvector('spanish', COALESCE(d.title, '') || ' ' || c.text)
-                  @@ websearch_to_tsquery('spanish', :q)
-            ORDER BY ts_rank(
-                to_tsvector('spanish', COALESCE(d.title, '') || ' ' || c.text),
-                websearch_to_tsquery('spanish', :q)
-            ) DESC
-            LIMIT :k
-            """
-        )
+        unit_vec = self._unit_vector(embedding)
+        cached = self._cached_context_semantic(source_id, unit_vec)
+        if cached is not None:
+            return {"context": cached}
+
+        # The three branches are independent reads: run them concurrently, each
+        # on its own session/connection so they don't serialize on one.
+        async def _dense() -> list:
+            return await self._fetch_rows(
+                _DENSE_STMT,
+                {
+                    "query_vec": embedding,
+                    "k": self.HYBRID_TOP_K_PER_LIST,
+                    "domain_1": domain_1,
+                    "domain_2": domain_2,
+                },
+                ef_search=self.HNSW_EF_SEARCH,
+            )
 
-        # Stage 6: a parallel dense lookup scoped to canonical /carreras/ pages.
-        # Without this the embedder can miss the carrera-home chunks (heavy
-        # boilerplate / TOC), and queries like "es presencial Medicina?",
-        # "duración Enfermería", "quién es la decana?" land on tangential pages
-        # and the model either declines or hallucinates names.
-        career_vector_sql = text(
-            """
-            SELECT
-              c.id::text AS cid,
-              d.canonical_url AS url,
-              COALESCE(d.title, '') AS title,
-              c.text AS chunk_text,
-              COALESCE(c.context, '') AS chunk_context,
-              d.fetched_at AS fetched_at
-            FROM chunks c
-            JOIN documents d ON d.doc_id = c.doc_id
-            JOIN sources s ON s.source_id = d.source_id
-            WHERE (lower(s.domain) = :domain_1 OR lower(s.domain) = :domain_2)
-              AND d.canonical_url ~ '/carreras/[^/]+$'
-              AND c.embedding IS NOT NULL
-            ORDER BY c.embedding <=> CAST(:query_vec AS vector)
-            LIMIT :k
-            """
-        )
-        async with async_session() as session:
-            vec_rows = (
-                await session.execute(
-                    vector_sql,
+        async def _sparse() -> list:
+            try:
+                return await self._fetch_rows(
+                    _FTS_STMT,
                     {
-                        "query_vec": query_vec,
+                        "q": query,
                         "k": self.HYBRID_TOP_K_PER_LIST,
                         "domain_1": domain_1,
                         "domain_2": domain_2,
                     },
                 )
-            ).mappings().all()
-            try:
-                fts_rows = (
-                    await session.execute(
-                        fts_sql,
-                        {
-                            "q": query,
-                            "k": self.HYBRID_TOP_K_PER_LIST,
-                            "domain_1": domain_1,
-                            "domain_2": domain_2,
-                        },
-                    )
-                ).mappings().all()
             except Exception:
                 logger.exception("FTS query failed; continuing with dense only")
-                fts_rows = []
+                return []
+
+        async def _career() -> list:
             try:
-                career_rows = (
-                    await session.execute(
-                        career_vector_sql,
-                        {
-                            "query_vec": query_vec,
-                            "k": 18,
-                            "domain_1": domain_1,
-                            "domain_2": domain_2,
-                        },
-                    )
-                ).mappings().all()
+                return await self._fetch_rows(
+                    _CAREER_DENSE_STMT,
+                    {
+                        "query_vec": embedding,
+                        "k": 18,
+                        "domain_1": domain_1,
+                        "domain_2": domain_2,
+                    },
+                    ef_search=self.HNSW_EF_SEARCH_FILTERED,
+                )
             except Exception:
                 logger.exception("Career-scoped retrieval failed; continuing without")
-                career_rows = []
+                return []
 
+        vec_rows, fts_rows, career_rows = await asyncio.gather(_dense(), _sparse(), _career())
+
+        # One pass per branch: collect the ranked cid list for RRF and keep the
+        # first row seen for each cid.
         by_cid: dict[str, dict] = {}
-        for row in [*vec_rows, *fts_rows, *career_rows]:
-            cid = str(row.get("cid") or "")
-            if not cid or cid in by_cid:
-                continue
-            by_cid[cid] = dict(row)
+        ranked_cids: list[list[str]] = []
+        for rows in (vec_rows, fts_rows, career_rows):
+            cids: list[str] = []
+            for row in rows:
+                cid = str(row.get("cid") or "")
+                if not cid:
+                    continue
+                cids.append(cid)
+                if cid not in by_cid:
+                    by_cid[cid] = dict(row)
+            ranked_cids.append(cids)
 
         if not by_cid:
             return {"context": []}
@@ -457,11 +657,7 @@ class RAGService:
         # results. The third list is what makes carrera-home chunks survive
         # past the rerank for short ambiguous queries.
         fused_cids = self._rrf_fuse(
-            [
-                [str(r.get("cid") or "") for r in vec_rows if r.get("cid")],
-                [str(r.get("cid") or "") for r in fts_rows if r.get("cid")],
-                [str(r.get("cid") or "") for r in career_rows if r.get("cid")],
-            ],
+            ranked_cids,
             c=self.HYBRID_RRF_C,
             top_n=self.HYBRID_RRF_TOP,
         )
@@ -506,33 +702,11 @@ class RAGService:
                 seed_cids.append(cid)
 
         if seed_cids:
-            neighbor_sql = text(
-                """
-                WITH seeds AS (
-                    SELECT doc_id, chunk_id
-                    FROM chunks
-                    WHERE id::text = ANY(:seed_cids)
-                )
-                SELECT DISTINCT
-                  c.id::text AS cid,
-                  d.canonical_url AS url,
-                  COALESCE(d.title, '') AS title,
-                  c.text AS chunk_text,
-                  COALESCE(c.context, '') AS chunk_context,
-                  d.fetched_at AS fetched_at,
-                  c.chunk_id
-                FROM chunks c
-                JOIN documents d ON d.doc_id = c.doc_id
-                JOIN seeds s ON s.doc_id = c.doc_id
-                WHERE ABS(c.chunk_id - s.chunk_id) <= :radius
-                ORDER BY c.chunk_id
-                """
-            )
             try:
                 async with async_session() as session:
                     neighbor_rows = (
                         await session.execute(
-                            neighbor_sql,
+                            _NEIGHBOR_STMT,
                             {
                                 "seed_cids": seed_cids,
                                 "radius": self.NEIGHBOR_EXPANSION_RADIUS,
@@ -596,18 +770,18 @@ class RAGService:
                 seen_cids.add(cid)
                 contexts.append(_format(dict(row)))
 
+        if contexts:
+            self._store_cached_context(source_id, key_query, unit_vec, contexts)
         return {"context": contexts}
 
-    async def generate(self, state: AgentState):
-        """LLM generation over the retrieved context. The user-facing prompt always
-        shows state["query"] (not the rewrite) so the answer references what was asked.
-        """
+    def _build_generate_prompt(self, state: AgentState) -> str | None:
+        """Assemble the generation prompt; None when there is no context to answer from."""
         query = (state.get("query") or "").strip()
         contexts = list(state.get("context") or [])
         history = list(state.get("history") or [])
 
         if not contexts:
-            return {"response": self.NO_INFO_RESPONSE}
+            return None
 
         joined: list[str] = []
         running = 0
@@ -639,11 +813,31 @@ class RAGService:
             budget = 1000
         if len(context_text) > budget:
             context_text = context_text[: budget - 1].rstrip() + "…"
-        prompt = prefix + context_text + question_block
+        return prefix + context_text + question_block
 
+    async def generate(self, state: AgentState):
+        """LLM generation over the retrieved context. The user-facing prompt always
+        shows state["query"] (not the rewrite) so the answer references what was asked.
+        """
+        prompt = self._build_generate_prompt(state)
+        if prompt is None:
+            return {"response": self.NO_INFO_RESPONSE}
         res = await self.llm.ainvoke(prompt)
         return {"response": (res.content or "").strip()}
 
+    async def stream_generate(self, state: AgentState) -> AsyncIterator[str]:
+        """Same prompt as generate(), yielding answer text as the model produces it.
+        Callers still run verify() on the joined text before persisting it.
+        """
+        prompt = self._build_generate_prompt(state)
+        if prompt is None:
+            yield self.NO_INFO_RESPONSE
+            return
+        async for chunk in self.llm.astream(prompt):
+            piece = chunk.content if isinstance(chunk.content, str) else ""
+            if piece:
+                yield piece
+
     async def verify(self, state: AgentState):
         """Replace the response with a decline message when groundedness < threshold."""
         response = (state.get("response") or "").strip()
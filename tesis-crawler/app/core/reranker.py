@@ -9,6 +9,7 @@ reasonably well in Spanish for question/answer relevance scoring.
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
 from functools import lru_cache
 from typing import Iterable, Sequence
@@ -16,6 +17,9 @@ from typing import Iterable, Sequence
 logger = logging.getLogger(__name__)
 
 DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-12-v2"
+# Large enough that the usual RRF pool (HYBRID_RRF_TOP = 60) is scored in a
+# single forward pass instead of two sentence-transformers default batches.
+PREDICT_BATCH_SIZE = 64
 
 
 @lru_cache(maxsize=1)
@@ -46,14 +50,13 @@ async def rerank(
 
     def _predict() -> list[float]:
         ce = _get_cross_encoder(model_name)
-        scores = ce.predict(pairs)
-        return [float(s) for s in scores]
+        scores = ce.predict(pairs, batch_size=PREDICT_BATCH_SIZE, convert_to_numpy=True)
+        return scores.tolist()
 
     scores = await asyncio.to_thread(_predict)
-    ranked = sorted(enumerate(scores), key=lambda t: t[1], reverse=True)
     if top_k is not None:
-        ranked = ranked[: max(0, int(top_k))]
-    return ranked
+        return heapq.nlargest(max(0, int(top_k)), enumerate(scores), key=lambda t: t[1])
+    return sorted(enumerate(scores), key=lambda t: t[1], reverse=True)
 
 
 def warmup(model_name: str = DEFAULT_MODEL) -> None:
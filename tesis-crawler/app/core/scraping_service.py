@@ -2,12 +2,13 @@
 Scraping Service — HTML page extraction with PDF link collection.
 
 Primary: Crawl4AI with pruning content filter and markdown generation.
-Fallback: httpx + BeautifulSoup for pages where Crawl4AI fails.
+Fallback: httpx + selectolax (lexbor) for pages where Crawl4AI fails.
 Collects PDF links from anchors during scraping for later processing.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
 from dataclasses import dataclass, field
@@ -15,13 +16,47 @@ from typing import Optional
 from urllib.parse import urljoin, urlparse
 
 import httpx
-from bs4 import BeautifulSoup
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crawl4ai.content_filter_strategy import PruningContentFilter
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from selectolax.lexbor import LexborHTMLParser
 
 logger = logging.getLogger(__name__)
 
+# Markdown prefix per HTML tag for the fallback converter. Tags not listed
+# here are skipped, so the css() query only yields the ones we render.
+_MARKDOWN_PREFIXES: dict[str, str] = {
+    "h1": "# ",
+    "h2": "## ",
+    "h3": "### ",
+    "h4": "#### ",
+    "h5": "#### ",
+    "h6": "#### ",
+    "p": "",
+    "div": "",
+    "section": "",
+    "td": "",
+    "th": "",
+    "li": "- ",
+}
+_MARKDOWN_SELECTOR = ",".join(_MARKDOWN_PREFIXES)
+_NOISE_SELECTORS = (
+    "header", "footer", "nav", "aside", "form",
+    ".post-navigation", ".sharedaddy", ".comments-area",
+)
+_CONTENT_SELECTORS = (
+    "main",
+    ".entry-content",
+    ".elementor-widget-theme-post-content",
+    ".elementor-tab-content",
+    ".e-n-tabs-content",
+    "article",
+    "body",
+)
+# Hrefs that already are absolute skip urljoin. Shared with the crawl worker's
+# PDF link extraction.
+_ABSOLUTE_URL_PREFIXES = ("https://", "http://")
+
 
 @dataclass
 class ScrapeResult:
@@ -43,7 +78,16 @@ class ScrapingService:
     PAGE_TIMEOUT_MS = 45_000
     DEFAULT_CACHE_MODE = CacheMode.WRITE_ONLY
 
+    # One browser and one HTTP/2 pool per service instance instead of one
+    # per scrape_page() call (browser launch ~1s, TCP/TLS ~100-300ms).
+    FALLBACK_TIMEOUT_S = 30.0
+    FALLBACK_MAX_CONNECTIONS = 50
+    FALLBACK_MAX_KEEPALIVE = 20
+
     def __init__(self):
+        self._crawler: AsyncWebCrawler | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._startup_lock = asyncio.Lock()
         self.prune = PruningContentFilter(threshold=0.25, min_word_threshold=8)
         self.md_gen = DefaultMarkdownGenerator(content_filter=self.prune)
         self.config = CrawlerRunConfig(
@@ -96,78 +140,112 @@ class ScrapingService:
             )
         return self.config
 
+    async def startup(self) -> None:
+        """Start the shared browser and HTTP client. Idempotent; scrape_page calls it lazily."""
+        if self._crawler is not None and self._http is not None:
+            return
+        async with self._startup_lock:
+            if self._http is None:
+                self._http = httpx.AsyncClient(
+                    http2=True,
+                    follow_redirects=True,
+                    timeout=httpx.Timeout(self.FALLBACK_TIMEOUT_S),
+                    limits=httpx.Limits(
+                        max_connections=self.FALLBACK_MAX_CONNECTIONS,
+                        max_keepalive_connections=self.FALLBACK_MAX_KEEPALIVE,
+                    ),
+                    verify=False,
+                )
+            if self._crawler is None:
+                crawler = AsyncWebCrawler()
+                try:
+                    await crawler.start()
+                except BaseException:
+                    # A half-started browser would otherwise leak its process.
+                    await self._close_crawler(crawler)
+                    raise
+                self._crawler = crawler
+
+    @staticmethod
+    async def _close_crawler(crawler: AsyncWebCrawler) -> None:
+        try:
+            await crawler.close()
+        except Exception as exc:  # noqa: BLE001 -- best-effort browser shutdown
+            logger.debug("Crawl4AI close failed: %s", exc)
+
+    async def aclose(self) -> None:
+        """Release the browser and HTTP pool. The service can be started again afterwards."""
+        async with self._startup_lock:
+            crawler, self._crawler = self._crawler, None
+            http, self._http = self._http, None
+            if crawler is not None:
+                await self._close_crawler(crawler)
+            if http is not None:
+                await http.aclose()
+
     async def scrape_page(self, url: str) -> ScrapeResult:
         """
         Scrape a page and return its title, markdown content, and discovered PDF links.
 
-        Tries Crawl4AI first, falls back to httpx + BeautifulSoup.
+        Tries Crawl4AI first, falls back to httpx + selectolax.
         """
         result = ScrapeResult()
 
         try:
-            async with AsyncWebCrawler() as crawler:
-                crawl_result = await crawler.arun(url, config=self._config_for_url(url))
+            await self.startup()
+            crawl_result = await self._crawler.arun(url, config=self._config_for_url(url))
 
-                if crawl_result.success and crawl_result.markdown:
-                    result.title = crawl_result.metadata.get("title", "")
-                    result.markdown = crawl_result.markdown
-                    result.success = True
+            if crawl_result.success and crawl_result.markdown:
+                result.title = crawl_result.metadata.get("title", "")
+                result.markdown = crawl_result.markdown
+                result.success = True
 
-                    # Extract PDF links from the raw HTML
-                    if crawl_result.html:
-                        result.pdf_links = self._extract_pdf_links(
-                            crawl_result.html, url
-                        )
+                # Extract PDF links from the raw HTML
+                if crawl_result.html:
+                    result.pdf_links = self.extract_pdf_links(
+                        crawl_result.html, url
+                    )
 
-                    return result
+                return result
         except Exception as exc:
             logger.debug("Crawl4AI failed for %s: %s, trying fallback", url, exc)
 
-        # ── Fallback: httpx + BeautifulSoup ──────────────────────────
+        # ── Fallback: httpx + selectolax ─────────────────────────────
         return await self._fallback_scrape(url)
 
     async def _fallback_scrape(self, url: str) -> ScrapeResult:
-        """Fallback scraper using httpx and BeautifulSoup."""
+        """Fallback scraper using httpx and selectolax (lexbor C parser)."""
         result = ScrapeResult()
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                timeout=httpx.Timeout(30.0),
-                verify=False,
-            ) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                html = resp.text
+            if self._http is None:
+                await self.startup()
+            resp = await self._http.get(url)
+            resp.raise_for_status()
+            html = resp.text
 
-            soup = BeautifulSoup(html, "html.parser")
+            tree = LexborHTMLParser(html)
 
             # Extract PDF links before cleaning
-            result.pdf_links = self._extract_pdf_links_from_soup(soup, url)
+            result.pdf_links = self._extract_pdf_links_from_tree(tree, url)
 
             # Clean navigation / noise
-            for selector in [
-                "header", "footer", "nav", "aside", "form",
-                ".post-navigation", ".sharedaddy", ".comments-area",
-            ]:
-                for node in soup.select(selector):
+            for selector in _NOISE_SELECTORS:
+                for node in tree.css(selector):
                     node.decompose()
 
             # Extract main content
-            content_el = (
-                soup.select_one("main")
-                or soup.select_one(".entry-content")
-                or soup.select_one(".elementor-widget-theme-post-content")
-                or soup.select_one(".elementor-tab-content")
-                or soup.select_one(".e-n-tabs-content")
-                or soup.select_one("article")
-                or soup.select_one("body")
-            )
+            content_node = None
+            for selector in _CONTENT_SELECTORS:
+                content_node = tree.css_first(selector)
+                if content_node is not None:
+                    break
 
-            result.title = soup.title.string.strip() if soup.title and soup.title.string else ""
+            title_node = tree.css_first("title")
+            result.title = title_node.text(strip=True) if title_node is not None else ""
 
-            if content_el:
+            if content_node is not None:
                 # Convert to simple markdown-like text
-                result.markdown = self._html_to_markdown(content_el)
+                result.markdown = self._html_to_markdown(content_node)
                 result.success = bool(result.markdown.strip())
 
         except Exception as exc:
@@ -175,19 +253,19 @@ class ScrapingService:
 
         return result
 
-    def _extract_pdf_links(self, html: str, base_url: str) -> list[str]:
+    @staticmethod
+    def extract_pdf_links(html: str, base_url: str) -> list[str]:
         """Extract PDF links from raw HTML string."""
-        soup = BeautifulSoup(html, "html.parser")
-        return self._extract_pdf_links_from_soup(soup, base_url)
+        return ScrapingService._extract_pdf_links_from_tree(LexborHTMLParser(html), base_url)
 
     @staticmethod
-    def _extract_pdf_links_from_soup(soup: BeautifulSoup, base_url: str) -> list[str]:
+    def _extract_pdf_links_from_tree(tree: LexborHTMLParser, base_url: str) -> list[str]:
         """Extract unique, absolute PDF URLs from anchor tags."""
         pdf_links: list[str] = []
         seen: set[str] = set()
 
-        for anchor in soup.find_all("a", href=True):
-            href = anchor["href"].strip()
+        for anchor in tree.css("a[href]"):
+            href = (anchor.attributes.get("href") or "").strip()
             if not href:
                 continue
 
@@ -196,8 +274,8 @@ class ScrapingService:
             if not (href_lower.endswith(".pdf") or ".pdf?" in href_lower):
                 continue
 
-            # Build absolute URL
-            absolute_url = urljoin(base_url, href)
+            # Build absolute URL (most hrefs already are; skip the urljoin parse)
+            absolute_url = href if href_lower.startswith(_ABSOLUTE_URL_PREFIXES) else urljoin(base_url, href)
 
             # Normalize for dedup
             normalized = absolute_url.split("#")[0].split("?")[0]
@@ -208,28 +286,15 @@ class ScrapingService:
         return pdf_links
 
     @staticmethod
-    def _html_to_markdown(element) -> str:
-        """Convert a BeautifulSoup element to basic markdown text."""
+    def _html_to_markdown(node) -> str:
+        """Convert a selectolax node to basic markdown text."""
         lines: list[str] = []
 
-        for tag in element.find_all(True):
-            text = tag.get_text(strip=True)
+        for tag in node.css(_MARKDOWN_SELECTOR):
+            text = tag.text(strip=True)
             if not text:
                 continue
-            tag_name = tag.name
-
-            if tag_name in ("h1",):
-                lines.append(f"# {text}")
-            elif tag_name in ("h2",):
-                lines.append(f"## {text}")
-            elif tag_name in ("h3",):
-                lines.append(f"### {text}")
-            elif tag_name in ("h4", "h5", "h6"):
-                lines.append(f"#### {text}")
-            elif tag_name in ("p", "div", "section", "td", "th"):
-                lines.append(text)
-            elif tag_name in ("li",):
-                lines.append(f"- {text}")
+            lines.append(_MARKDOWN_PREFIXES[tag.tag] + text)
 
         # Deduplicate consecutive identical lines
         cleaned: list[str] = []
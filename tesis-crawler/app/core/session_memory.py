@@ -2,10 +2,28 @@ class SessionMemory:
     def __init__(self, max_turns: int = 24):
         self._max_turns = max_turns
 
-    async def ensure_session(self, session_id: str) -> str:
-        from sqlalchemy import select
+    @staticmethod
+    async def _upsert_session(session, session_id: str) -> None:
+        """Create-or-touch the session row in one statement instead of SELECT + INSERT/UPDATE."""
+        from sqlalchemy.dialects.postgresql import insert
 
         from app.embedding.models import ConversationSession, utc_now_naive
+
+        now = utc_now_naive()
+        upsert = insert(ConversationSession).values(
+            session_id=session_id,
+            created_at=now,
+            last_activity_at=now,
+            session_state={},
+        )
+        await session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=["session_id"],
+                set_={"last_activity_at": upsert.excluded.last_activity_at},
+            )
+        )
+
+    async def ensure_session(self, session_id: str) -> str:
         from app.storage.db_client import async_session
 
         sid = (session_id or "").strip()
@@ -13,14 +31,7 @@ class SessionMemory:
             raise ValueError("session_id es obligatorio")
 
         async with async_session() as session:
-            existing = await session.execute(
-                select(ConversationSession).where(ConversationSession.session_id == sid)
-            )
-            row = existing.scalar_one_or_none()
-            if row is None:
-                session.add(ConversationSession(session_id=sid))
-            else:
-                row.last_activity_at = utc_now_naive()
+            await self._upsert_session(session, sid)
             await session.commit()
         return sid
 
@@ -31,13 +42,7 @@ class SessionMemory:
         await self._append_message(session_id, "assistant", text, source_id=source_id)
 
     async def _append_message(self, session_id: str, role: str, text: str, source_id=None) -> None:
-        from sqlalchemy import select
-
-        from app.embedding.models import (
-            ConversationMessage,
-            ConversationSession,
-            utc_now_naive,
-        )
+        from app.embedding.models import ConversationMessage
         from app.storage.db_client import async_session
 
         sid = (session_id or "").strip()
@@ -48,15 +53,7 @@ class SessionMemory:
             return
 
         async with async_session() as session:
-            existing = await session.execute(
-                select(ConversationSession).where(ConversationSession.session_id == sid)
-            )
-            sess = existing.scalar_one_or_none()
-            if sess is None:
-                sess = ConversationSession(session_id=sid)
-                session.add(sess)
-                await session.flush()
-            sess.last_activity_at = utc_now_naive()
+            await self._upsert_session(session, sid)
             session.add(
                 ConversationMessage(
                     session_id=sid,
@@ -78,15 +75,15 @@ class SessionMemory:
             return []
 
         async with async_session() as session:
-            stmt = select(ConversationMessage).where(
+            # Only the two columns we format; no ORM objects for history rows.
+            stmt = select(ConversationMessage.role, ConversationMessage.text).where(
                 ConversationMessage.session_id == sid
             )
             if source_id is not None:
                 stmt = stmt.where(ConversationMessage.source_id == source_id)
             stmt = stmt.order_by(ConversationMessage.created_at.desc()).limit(max(1, max_items))
-            rows = (await session.execute(stmt)).scalars().all()
-        rows = list(reversed(rows))
-        return [f"{msg.role.upper()}: {msg.text}" for msg in rows]
+            rows = (await session.execute(stmt)).all()
+        return [f"{role.upper()}: {text}" for role, text in reversed(rows)]
 
     async def get_state(self, session_id: str) -> dict:
         from sqlalchemy import select
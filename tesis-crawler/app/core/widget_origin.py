@@ -1,3 +1,6 @@
+import asyncio
+import logging
+import time
 from urllib.parse import urlparse
 from uuid import UUID
 
@@ -7,6 +10,53 @@ from app.config import settings
 from app.core.domain_utils import domain_variants
 from app.storage.db_client import async_session
 
+logger = logging.getLogger(__name__)
+
+# In-process snapshot of `sources`, refreshed on a timer instead of querying
+# the table on every CORS check. A miss forces an early refresh (rate
+# limited) so a newly registered source doesn't wait for the full TTL.
+_ORIGIN_CACHE_TTL_SECONDS = 30.0
+_ORIGIN_CACHE_MISS_REFRESH_SECONDS = 5.0
+# Background refresh runs well inside the TTL, so in steady state the
+# request path only does a frozenset lookup and never waits on Postgres.
+_ORIGIN_CACHE_BACKGROUND_REFRESH_SECONDS = _ORIGIN_CACHE_TTL_SECONDS / 2
+_SOURCE_DOMAINS_STMT = text("SELECT source_id::text AS source_id, domain FROM sources")
+
+_allowed_hosts: frozenset[str] = frozenset()
+_hosts_by_source: dict[str, frozenset[str]] = {}
+_origin_cache_at: float | None = None
+_origin_cache_lock = asyncio.Lock()
+
+
+async def _refresh_origin_cache(max_age: float) -> None:
+    global _allowed_hosts, _hosts_by_source, _origin_cache_at
+    if _origin_cache_at is not None and time.monotonic() - _origin_cache_at <= max_age:
+        return
+    async with _origin_cache_lock:
+        # Another request may have refreshed while we waited on the lock.
+        if _origin_cache_at is not None and time.monotonic() - _origin_cache_at <= max_age:
+            return
+        async with async_session() as session:
+            rows = (await session.execute(_SOURCE_DOMAINS_STMT)).mappings().all()
+        hosts_by_source: dict[str, frozenset[str]] = {}
+        for row in rows:
+            domain = (row.get("domain") or "").strip().lower()
+            hosts_by_source[str(row.get("source_id"))] = frozenset(domain_variants(domain))
+        _hosts_by_source = hosts_by_source
+        _allowed_hosts = frozenset().union(*hosts_by_source.values())
+        _origin_cache_at = time.monotonic()
+
+
+async def refresh_origin_cache_loop() -> None:
+    """Keep the origin snapshot warm. Run as a background task for the app's lifetime."""
+    while True:
+        try:
+            await _refresh_origin_cache(0.0)
+        except Exception as exc:  # noqa: BLE001 -- the loop must outlive any DB error
+            # Keep serving the last snapshot; request-path misses still refresh.
+            logger.warning("Widget origin cache refresh failed: %s", exc)
+        await asyncio.sleep(_ORIGIN_CACHE_BACKGROUND_REFRESH_SECONDS)
+
 
 def _normalize_origin(origin: str) -> str:
     value = (origin or "").strip()
@@ -52,14 +102,11 @@ async def is_origin_allowed_globally(origin: str) -> bool:
     if not host:
         return False
 
-    stmt = text("SELECT domain FROM sources")
-    async with async_session() as session:
-        rows = (await session.execute(stmt)).mappings().all()
-    for row in rows:
-        domain = (row.get("domain") or "").strip().lower()
-        if host in domain_variants(domain):
-            return True
-    return False
+    await _refresh_origin_cache(_ORIGIN_CACHE_TTL_SECONDS)
+    if host in _allowed_hosts:
+        return True
+    await _refresh_origin_cache(_ORIGIN_CACHE_MISS_REFRESH_SECONDS)
+    return host in _allowed_hosts
 
 
 async def is_origin_allowed_for_source(origin: str, source_id: UUID) -> bool:
@@ -75,23 +122,12 @@ async def is_origin_allowed_for_source(origin: str, source_id: UUID) -> bool:
     if not host:
         return False
 
-    stmt = text(
-        """
-        SELECT domain
-        FROM sources
-        WHERE source_id = CAST(:source_id AS uuid)
-        LIMIT 1
-        """
-    )
-    async with async_session() as session:
-        row = (
-            await session.execute(stmt, {"source_id": str(source_id)})
-        ).mappings().first()
-    if not row:
-        return False
-
-    domain = (row.get("domain") or "").strip().lower()
-    return host in domain_variants(domain)
+    key = str(source_id)
+    await _refresh_origin_cache(_ORIGIN_CACHE_TTL_SECONDS)
+    if host in _hosts_by_source.get(key, ()):
+        return True
+    await _refresh_origin_cache(_ORIGIN_CACHE_MISS_REFRESH_SECONDS)
+    return host in _hosts_by_source.get(key, ())
 
 
 def allowed_origins_for_domain(domain: str) -> list[str]:
@@ -103,10 +139,4 @@ def allowed_origins_for_domain(domain: str) -> list[str]:
     if test_origin:
         origins.append(test_origin)
     # Dedup preserving order
-    seen: set[str] = set()
-    out: list[str] = []
-    for item in origins:
-        if item and item not in seen:
-            seen.add(item)
-            out.append(item)
-    return out
+    return list(dict.fromkeys(item for item in origins if item))
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from sqlalchemy import UniqueConstraint, ForeignKey, Index
 from sqlmodel import SQLModel, Field, Column, ARRAY, Text, JSON, Integer
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 
 
 EMBEDDING_DIM = 1536
@@ -50,7 +50,16 @@ class Chunk(SQLModel, table=True):
     chunk_id: int = Field(sa_column=Column(Integer, nullable=False))  # 0-based seq within doc
     text: str = Field(sa_column=Column(Text, nullable=False))
     context: Optional[str] = Field(default=None, sa_column=Column(Text))  # filled by Stage 2 contextual retrieval
-    embedding: Any = Field(sa_column=Column(Vector(EMBEDDING_DIM), nullable=False))
+    # halfvec: half the bytes per row and per HNSW node vs vector(float4),
+    # with negligible recall loss for cosine search.
+    embedding: Any = Field(sa_column=Column(HALFVEC(EMBEDDING_DIM), nullable=False))
+    # Denormalized from documents.canonical_url (/carreras/<slug>) so the
+    # career-scoped dense branch can use a partial HNSW index instead of
+    # re-checking a URL regex on every candidate row.
+    is_career_page: bool = Field(default=False)
+    # Denormalized from documents.title, written by the ingest COPY: the
+    # generated search_tsv (added in init_db) weights it with the chunk text.
+    doc_title: Optional[str] = Field(default=None, sa_column=Column(Text))
     token_count: Optional[int] = Field(default=None)
     created_at: datetime = Field(default_factory=utc_now_naive)
 
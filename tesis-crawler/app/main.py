@@ -38,9 +38,11 @@ for _noisy in (
 from fastapi.responses import JSONResponse
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
 from app.api import auth, query, scrape, sources, status, widget
+from app.api.scrape import close_refresh_scraper
 from app.core.reranker import warmup as warmup_reranker
-from app.core.widget_origin import is_origin_allowed_globally
+from app.core.widget_origin import is_origin_allowed_globally, refresh_origin_cache_loop
 from app.storage.db_client import init_db
 
 
@@ -52,34 +54,66 @@ app = FastAPI(title="UNNE Med RAG")
 static_dir = Path(__file__).parent / "static"
 
 
-@app.middleware("http")
-async def dynamic_widget_cors(request, call_next):
-    path = (request.url.path or "").lower()
-    if not path.startswith("/api/widget/"):
-        return await call_next(request)
-
-    origin = (request.headers.get("origin") or "").strip()
-    if request.method.upper() == "OPTIONS":
-        if not origin:
-            return JSONResponse({"detail": "Origin header requerido"}, status_code=400)
-        if not await is_origin_allowed_globally(origin):
-            return JSONResponse({"detail": "Origin no permitido"}, status_code=403)
-        response = JSONResponse({"ok": True}, status_code=200)
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Vary"] = "Origin"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "POST,GET,OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type,X-API-Key"
-        return response
-
-    response = await call_next(request)
-    if origin and await is_origin_allowed_globally(origin):
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Vary"] = "Origin"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "POST,GET,OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type,X-API-Key"
-    return response
+_WIDGET_PATH_PREFIX = "/api/widget/"
+_WIDGET_CORS_HEADERS = {
+    "Vary": "Origin",
+    "Access-Control-Allow-Credentials": "true",
+    "Access-Control-Allow-Methods": "POST,GET,OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type,X-API-Key",
+}
+
+
+class WidgetCORSMiddleware:
+    """
+    Per-source CORS for /api/widget/*. Allowed origins come from the
+    `sources` table (served from widget_origin's in-process snapshot), so
+    Starlette's static CORSMiddleware can't express them.
+
+    Plain ASGI instead of @app.middleware("http"): every other path passes
+    straight through without the BaseHTTPMiddleware request/response
+    wrapping, and widget SSE responses aren't re-buffered through it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Lowercased so /API/Widget/... gets the same CORS handling.
+        if scope["type"] != "http" or not scope["path"].lower().startswith(_WIDGET_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        origin = (Headers(scope=scope).get("origin") or "").strip()
+        if scope["method"] == "OPTIONS":
+            if not origin:
+                response = JSONResponse({"detail": "Origin header requerido"}, status_code=400)
+            elif not await is_origin_allowed_globally(origin):
+                response = JSONResponse({"detail": "Origin no permitido"}, status_code=403)
+            else:
+                response = JSONResponse(
+                    {"ok": True},
+                    status_code=200,
+                    headers={"Access-Control-Allow-Origin": origin, **_WIDGET_CORS_HEADERS},
+                )
+            await response(scope, receive, send)
+            return
+
+        if not origin or not await is_origin_allowed_globally(origin):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["Access-Control-Allow-Origin"] = origin
+                for key, value in _WIDGET_CORS_HEADERS.items():
+                    headers[key] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+app.add_middleware(WidgetCORSMiddleware)
 
 
 @app.on_event("startup")
@@ -88,6 +122,17 @@ async def startup():
     # Stage 3+ uses a cross-encoder reranker (~120MB, ~10-20s to load).
     # Warm it up at boot in a thread so the first user query doesn't pay the cold-start.
     asyncio.create_task(asyncio.to_thread(warmup_reranker))
+    # Widget CORS checks read an in-process origin snapshot; refresh it off
+    # the request path so no widget request waits on the sources query.
+    app.state.origin_refresh_task = asyncio.create_task(refresh_origin_cache_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    origin_refresh_task = getattr(app.state, "origin_refresh_task", None)
+    if origin_refresh_task is not None:
+        origin_refresh_task.cancel()
+    await close_refresh_scraper()
 
 
 app.include_router(scrape.router, prefix="/api")
@@ -1,20 +1,22 @@
-import asyncio
 import logging
 
-import psycopg
-from psycopg import sql
-from psycopg.errors import DuplicateDatabase
+import asyncpg
 from sqlalchemy import text
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 from app.config import settings
+from app.embedding.models import EMBEDDING_DIM
 import app.embedding.models  # noqa: F401  -- ensure all models are registered before create_all
 
 
 logger = logging.getLogger(__name__)
 
+# Scoped to the init transaction. Only matters when an index is actually
+# built: HNSW and GIN builds are much faster when they fit in memory.
+INDEX_BUILD_MAINTENANCE_WORK_MEM = "1GB"
+
 
 def _build_async_engine_url() -> str:
     """Use asyncpg for SQLAlchemy async engine on Windows-compatible event loops."""
@@ -26,60 +28,231 @@ def _build_async_engine_url() -> str:
     return url.render_as_string(hide_password=False)
 
 
-engine = create_async_engine(_build_async_engine_url(), echo=False)
+engine = create_async_engine(
+    _build_async_engine_url(),
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    # A crawl burst can leave many connections idle; pre-ping catches ones
+    # closed server-side, and LIFO keeps reusing the few hot ones so the
+    # rest age out instead of all staying half-warm.
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    # The HNSW/FTS retrieval queries carry high planner cost estimates, which
+    # trips Postgres JIT compilation (tens of ms) on statements that execute
+    # in a few ms. Short OLTP-style reads never amortize it.
+    connect_args={"server_settings": {"jit": "off"}},
+)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-def _build_psycopg_dsn(database: str | None = None) -> str:
+def _build_plain_dsn(database: str | None = None) -> str:
     url = make_url(settings.DATABASE_URL)
     if database is not None:
         url = url.set(database=database)
-    # psycopg.connect espera driver "postgresql", no "postgresql+psycopg"
+    # asyncpg.connect espera driver "postgresql", no "postgresql+psycopg"
     url = url.set(drivername=url.drivername.split("+", 1)[0])
     return url.render_as_string(hide_password=False)
 
 
-def _ensure_database_exists_sync() -> None:
+async def _ensure_database_exists() -> None:
     target_url = make_url(settings.DATABASE_URL)
     target_db = target_url.database
     if not target_db:
         return
 
-    admin_dsn = _build_psycopg_dsn(database="postgres")
-    with psycopg.connect(admin_dsn, autocommit=True) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (target_db,))
-            if cur.fetchone() is None:
-                try:
-                    cur.execute(
-                        sql.SQL("CREATE DATABASE {}").format(sql.Identifier(target_db))
-                    )
-                except DuplicateDatabase:
-                    pass
+    conn = await asyncpg.connect(_build_plain_dsn(database="postgres"))
+    try:
+        exists = await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", target_db)
+        if exists is None:
+            # CREATE DATABASE takes no bind params; quote the identifier.
+            quoted = '"' + target_db.replace('"', '""') + '"'
+            try:
+                await conn.execute(f"CREATE DATABASE {quoted}")
+            except asyncpg.DuplicateDatabaseError:
+                pass
+    finally:
+        await conn.close()
+
+
+async def _add_chunks_career_page_column(conn) -> None:
+    """Add chunks.is_career_page to a legacy table and backfill it, once."""
+    exists = (
+        await conn.execute(
+            text(
+                """
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'chunks'
+                  AND column_name = 'is_career_page'
+                """
+            )
+        )
+    ).scalar()
+    if exists:
+        return
+    await conn.execute(
+        text(
+            """
+            ALTER TABLE IF EXISTS chunks
+            ADD COLUMN IF NOT EXISTS is_career_page BOOLEAN NOT NULL DEFAULT false
+            """
+        )
+    )
+    # Rows ingested before the column existed.
+    await conn.execute(
+        text(
+            """
+            UPDATE chunks c
+            SET is_career_page = true
+            FROM documents d
+            WHERE d.doc_id = c.doc_id
+              AND d.canonical_url ~ '/carreras/[^/]+$'
+            """
+        )
+    )
+
+
+async def _add_chunks_search_columns(conn) -> None:
+    """
+    Chunk-level FTS vector: the document title (weight A) plus the chunk
+    text, so one GIN index serves the title+text match. A generated column
+    can't read documents, so ingest copies the title into chunks.doc_title.
+    Idempotent.
+    """
+    has_doc_title = (
+        await conn.execute(
+            text(
+                """
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'chunks'
+                  AND column_name = 'doc_title'
+                """
+            )
+        )
+    ).scalar()
+    if not has_doc_title:
+        await conn.execute(text("ALTER TABLE IF EXISTS chunks ADD COLUMN IF NOT EXISTS doc_title TEXT"))
+        # Rows ingested before the column existed.
+        await conn.execute(
+            text(
+                """
+                UPDATE chunks c
+                SET doc_title = d.title
+                FROM documents d
+                WHERE d.doc_id = c.doc_id
+                """
+            )
+        )
+    # Generated columns stay out of the SQLModel models (the ORM must never
+    # write them).
+    await conn.execute(
+        text(
+            """
+            ALTER TABLE IF EXISTS chunks
+            ADD COLUMN IF NOT EXISTS search_tsv tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('spanish', coalesce(doc_title, '')), 'A')
+                || to_tsvector('spanish', coalesce(text, ''))
+            ) STORED
+            """
+        )
+    )
+    # Per-table vectors from before search_tsv; dropping chunks.tsv also
+    # drops its GIN index.
+    await conn.execute(text("ALTER TABLE IF EXISTS chunks DROP COLUMN IF EXISTS tsv"))
+    await conn.execute(text("ALTER TABLE IF EXISTS documents DROP COLUMN IF EXISTS title_tsv"))
+
+
+async def _migrate_chunks_embedding_to_halfvec(conn) -> None:
+    """Convert a legacy vector(N) chunks.embedding column to halfvec(N). Idempotent."""
+    current_type = (
+        await conn.execute(
+            text(
+                """
+                SELECT format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                WHERE a.attrelid = to_regclass('chunks')
+                  AND a.attname = 'embedding'
+                  AND NOT a.attisdropped
+                """
+            )
+        )
+    ).scalar()
+    if not current_type or not current_type.startswith("vector"):
+        return
+    logger.info("Migrating chunks.embedding from %s to halfvec(%d)", current_type, EMBEDDING_DIM)
+    # The HNSW indexes use vector_cosine_ops and can't survive the type change;
+    # _ensure_chunks_indexes rebuilds them with halfvec_cosine_ops.
+    await conn.execute(text("DROP INDEX IF EXISTS chunks_embedding_hnsw_idx"))
+    await conn.execute(text("DROP INDEX IF EXISTS chunks_embedding_career_hnsw_idx"))
+    await conn.execute(
+        text(
+            f"""
+            ALTER TABLE chunks
+            ALTER COLUMN embedding TYPE halfvec({EMBEDDING_DIM})
+            USING embedding::halfvec({EMBEDDING_DIM})
+            """
+        )
+    )
 
 
 async def _ensure_chunks_indexes(conn) -> None:
     """Create HNSW (vector) and GIN (FTS) indexes on chunks. Idempotent."""
+    await conn.execute(
+        text("SELECT set_config('maintenance_work_mem', :mem, true)"),
+        {"mem": INDEX_BUILD_MAINTENANCE_WORK_MEM},
+    )
     await conn.execute(
         text(
             """
             CREATE INDEX IF NOT EXISTS chunks_embedding_hnsw_idx
-            ON chunks USING hnsw (embedding vector_cosine_ops)
+            ON chunks USING hnsw (embedding halfvec_cosine_ops)
+            """
+        )
+    )
+    # Partial HNSW over canonical /carreras/<slug> chunks only: the
+    # career-scoped retrieval branch walks this much smaller graph.
+    await conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS chunks_embedding_career_hnsw_idx
+            ON chunks USING hnsw (embedding halfvec_cosine_ops)
+            WHERE is_career_page
             """
         )
     )
+    # The FTS branch matches `c.search_tsv @@ tsq`; the old expression index
+    # on to_tsvector('spanish', text) never served it.
+    await conn.execute(text("DROP INDEX IF EXISTS chunks_text_fts_idx"))
+    await conn.execute(
+        text(
+            """
+            CREATE INDEX IF NOT EXISTS chunks_search_tsv_gin_idx
+            ON chunks USING gin (search_tsv)
+            """
+        )
+    )
+
+
+async def _ensure_conversation_indexes(conn) -> None:
+    """Composite index for recent_history (session + source, newest first). Idempotent."""
     await conn.execute(
         text(
             """
-            CREATE INDEX IF NOT EXISTS chunks_text_fts_idx
-            ON chunks USING gin (to_tsvector('spanish', text))
+            CREATE INDEX IF NOT EXISTS conversation_messages_session_source_created_idx
+            ON conversation_messages (session_id, source_id, created_at DESC)
             """
         )
     )
 
 
 async def init_db():
-    await asyncio.to_thread(_ensure_database_exists_sync)
+    await _ensure_database_exists()
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(SQLModel.metadata.create_all)
@@ -91,7 +264,11 @@ async def init_db():
                 """
             )
         )
+        await _add_chunks_career_page_column(conn)
+        await _add_chunks_search_columns(conn)
+        await _migrate_chunks_embedding_to_halfvec(conn)
         await _ensure_chunks_indexes(conn)
+        await _ensure_conversation_indexes(conn)
 
 
 async def get_session():
@@ -3,19 +3,20 @@ Crawl Worker — institutional crawl with async HTML + PDF ingestion.
 """
 
 from datetime import datetime
+from functools import lru_cache
 import hashlib
 import json
 import logging
 import re
 import asyncio
 import time
+from collections import OrderedDict
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
-from typing import Callable, Optional, Any
+from typing import Any, Callable, ClassVar, Optional
 from xml.etree import ElementTree as ET
 
 import httpx
-from bs4 import BeautifulSoup
 from crawl4ai import AsyncWebCrawler
 from crawl4ai.async_dispatcher import MemoryAdaptiveDispatcher, SemaphoreDispatcher
 from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
@@ -25,19 +26,35 @@ from app.core.content_filters import should_index_page
 from app.core.domain_utils import normalize_host_exact
 from app.core.page_classifier import PageClassifier
 from app.core.pdf_service import PDFService
-from app.core.scraping_service import ScrapingService
-from app.core.ingestion_service import IngestionService
+from app.core.scraping_service import _ABSOLUTE_URL_PREFIXES, ScrapingService
+from app.core.ingestion_service import IngestionService, PreparedChunks
 from app.storage.db_client import async_session
 
 logger = logging.getLogger(__name__)
 
+_YEAR_CANDIDATE_RE = re.compile(r"20\d{2}")
+_MARKDOWN_PDF_LINK_RE = re.compile(r"\[[^\]]+\]\(([^)]+\.pdf(?:\?[^)]*)?)\)", re.IGNORECASE)
 
-class ExactHostFilter(URLFilter):
+
+class _RejectedUrlSamples:
+    """Bounded, insertion-ordered, de-duplicated sample of rejected URLs for the debug report."""
+
+    def _init_rejected_samples(self, sample_limit: int) -> None:
+        self._sample_limit = sample_limit
+        self._sample_set: set[str] = set()
+        self.rejected_url_samples: list[str] = []
+
+    def record_rejected(self, url: str) -> None:
+        if url and url not in self._sample_set and len(self._sample_set) < self._sample_limit:
+            self._sample_set.add(url)
+            self.rejected_url_samples.append(url)
+
+
+class ExactHostFilter(_RejectedUrlSamples, URLFilter):
     def __init__(self, host: str, sample_limit: int = 50000):
         super().__init__()
         self._allowed_host = normalize_host_exact(host)
-        self._sample_limit = sample_limit
-        self.rejected_url_samples: list[str] = []
+        self._init_rejected_samples(sample_limit)
 
     def is_allowed(self, url: str) -> bool:
         parsed = urlparse(url)
@@ -50,22 +67,61 @@ class ExactHostFilter(URLFilter):
 
     def apply(self, url: str) -> bool:
         result = self.is_allowed(url)
-        if not result and len(self.rejected_url_samples) < self._sample_limit:
-            self.rejected_url_samples.append(url)
+        if not result:
+            self.record_rejected(url)
         self._update_stats(result)
         return result
 
 
-class TrackingPatternFilter(URLPatternFilter):
-    def __init__(self, *args, sample_limit: int = 50000, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._sample_limit = sample_limit
-        self.rejected_url_samples: list[str] = []
+def _glob_to_search_regex(pattern: str) -> str:
+    """Translate a `*`/`?` glob into an unanchored regex with the same search semantics."""
+    head = "" if pattern.startswith("*") else r"\A"
+    tail = "" if pattern.endswith("*") else r"\Z"
+    body = "".join(
+        ".*" if ch == "*" else "." if ch == "?" else re.escape(ch)
+        for ch in pattern.strip("*")
+    )
+    return head + body + tail
+
+
+@lru_cache(maxsize=8)
+def _compile_glob_alternation(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    """One compiled search regex per distinct pattern list, shared across crawls."""
+    return re.compile("|".join(map(_glob_to_search_regex, patterns)), re.DOTALL)
+
+
+class TrackingPatternFilter(_RejectedUrlSamples, URLPatternFilter):
+    def __init__(self, patterns, *args, reverse: bool = False, sample_limit: int = 50000, **kwargs):
+        super().__init__(patterns, *args, reverse=reverse, **kwargs)
+        self._init_rejected_samples(sample_limit)
+        # URLPatternFilter runs one fnmatch regex per multi-star glob, each
+        # anchored as `(?>.*?X).*\Z` — ~60 backtracking scans per URL. Plain
+        # `*`/`?` globs collapse into one unanchored alternation instead.
+        self._reverse_match = reverse
+        self._combined: re.Pattern[str] | None = None
+        if isinstance(patterns, (list, tuple)) and patterns and all(map(self._is_plain_path_glob, patterns)):
+            self._combined = _compile_glob_alternation(tuple(patterns))
+
+    @staticmethod
+    def _is_plain_path_glob(pattern) -> bool:
+        """True for globs URLPatternFilter treats as fnmatch PATH patterns (no suffix/prefix/regex forms)."""
+        if not isinstance(pattern, str) or any(c in pattern for c in "[]{}"):
+            return False
+        if pattern.startswith("^") or pattern.endswith("$") or "\\d" in pattern or "**" in pattern:
+            return False
+        if pattern.count("*") == 1 and (pattern.startswith("*.") or pattern.endswith("/*")):
+            return False
+        return not ("://" in pattern and pattern.startswith("*."))
 
     def apply(self, url: str) -> bool:
-        result = super().apply((url or "").lower())
-        if not result and len(self.rejected_url_samples) < self._sample_limit:
-            self.rejected_url_samples.append(url)
+        if self._combined is None:
+            result = super().apply((url or "").lower())
+        else:
+            matched = self._combined.search((url or "").lower()) is not None
+            self._update_stats(matched)
+            result = not matched if self._reverse_match else matched
+        if not result:
+            self.record_rejected(url)
         return result
 
 
@@ -87,15 +143,96 @@ class CrawlWorker:
         "/tramites",
         "/trámites",
     )
+    _ALLOW_PRIORITY_RE = re.compile("|".join(map(re.escape, ALLOW_PRIORITY_TOKENS)))
+
+    # URL globs kept out of BFS traversal (TrackingPatternFilter, reverse=True).
+    BLOCK_URL_PATTERNS = (
+        "*/attachment/*",
+        "*attachment_id=*",
+        "*/feed/*",
+        "*/wp-json/*",
+        "*/wp-admin/*",
+        "*/wp-login.php*",
+        "*/xmlrpc.php*",
+        "*/?s=*",
+        "*?fluentcrm=*",
+        "*/search/*",
+        "*/siga*",
+        "*/cvm-prop-form/*",
+        # Images
+        "*.jpg*",
+        "*.jpeg*",
+        "*.png*",
+        "*.gif*",
+        "*.webp*",
+        "*.svg*",
+        # Audio
+        "*.mp3*",
+        "*.wav*",
+        "*.ogg*",
+        "*.m4a*",
+        "*.aac*",
+        # Video
+        "*.mp4*",
+        "*.webm*",
+        "*.avi*",
+        "*.mov*",
+        "*.mkv*",
+        # Binary/documents are blocked from crawler traversal.
+        # PDFs are handled asynchronously when extracted from HTML pages.
+        "*.pdf*",
+        "*.doc*",
+        "*.docx*",
+        "*.xls*",
+        "*.xlsx*",
+        "*.ppt*",
+        "*.pptx*",
+        "*/wp-content/uploads/*",
+        # Archives
+        "*.zip*",
+        "*.rar*",
+        "*.7z*",
+        # ── NEWS / EVENTS / COMMUNICATIONS — hard blocked ──
+        "*/noticia/*",
+        "*/noticias/*",
+        "*/notimed/*",
+        "*/novedad/*",
+        "*/novedades/*",
+        "*/prensa/*",
+        "*/comunicado/*",
+        "*/comunicados/*",
+        "*/blog/*",
+        "*/news/*",
+        "*/evento/*",
+        "*/eventos/*",
+        "*/agenda/*",
+        "*/actualidad/*",
+        "*/actualidades/*",
+        "*/boletin/*",
+        "*/newsletter/*",
+        "*/gacetilla/*",
+        "*/efemeride/*",
+        "*/efemerides/*",
+    )
 
     SITEMAP_PATHS = ("/sitemap_index.xml", "/sitemap.xml")
     SITEMAP_NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+    SITEMAP_FETCH_CONCURRENCY = 8
+    # Pages already waiting in the ingest queue are saved in one session and
+    # committed together (one SAVEPOINT per page) instead of one commit each.
+    INGEST_BATCH_SIZE = 32
+    # Digest of the last markdown written per file path. Class-level so it
+    # survives across crawls in the same process (a CrawlWorker is built per
+    # job); a re-crawl with identical content skips the disk write.
+    MARKDOWN_DIGEST_CACHE_MAX_ENTRIES = 50000
+    _markdown_digests: ClassVar[OrderedDict[str, bytes]] = OrderedDict()
 
     def __init__(self):
         self.scraper = ScrapingService()
         self.ingestor = IngestionService()
         self.classifier = PageClassifier()
         self.pdf_service = PDFService()
+        self._markdown_dir_ready = False
 
     @classmethod
     async def _fetch_sitemap_urls(cls, start_url: str, host_filter: "ExactHostFilter") -> list[str]:
@@ -110,13 +247,11 @@ class CrawlWorker:
         seen: set[str] = set()
         urls: list[str] = []
 
-        async def _fetch(url: str) -> str | None:
+        semaphore = asyncio.Semaphore(cls.SITEMAP_FETCH_CONCURRENCY)
+
+        async def _fetch(client: httpx.AsyncClient, url: str) -> str | None:
             try:
-                async with httpx.AsyncClient(
-                    follow_redirects=True,
-                    timeout=httpx.Timeout(15.0),
-                    headers={"User-Agent": "tesis-crawler/0.1 (sitemap-discovery)"},
-                ) as client:
+                async with semaphore:
                     resp = await client.get(url)
                 if resp.status_code != 200 or not (resp.content or b"").strip():
                     return None
@@ -148,37 +283,49 @@ class CrawlWorker:
         candidates: list[str] = [base + p for p in cls.SITEMAP_PATHS]
         explored: set[str] = set()
 
-        while candidates and len(urls) < 5000:
-            current = candidates.pop(0)
-            if current in explored:
-                continue
-            explored.add(current)
-            xml_text = await _fetch(current)
-            if not xml_text:
-                continue
-            page_urls, child_sitemaps = _parse(xml_text)
-            for child in child_sitemaps:
-                if child not in explored:
-                    candidates.append(child)
-            for u in page_urls:
-                if u in seen:
-                    continue
-                if not host_filter.is_allowed(u):
-                    continue
-                low = u.lower()
-                if low.endswith(".pdf") or ".pdf?" in low:
-                    continue  # PDFs flow through the dedicated PDF queue
-                seen.add(u)
-                urls.append(u)
-                if len(urls) >= 5000:
-                    break
+        # Walk the sitemap tree level by level: every sitemap at a level is
+        # fetched concurrently over one shared client, then parsed in order so
+        # the resulting URL list is identical to a sequential walk.
+        async with httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(15.0),
+            headers={"User-Agent": "tesis-crawler/0.1 (sitemap-discovery)"},
+        ) as client:
+            while candidates and len(urls) < 5000:
+                level = [c for c in dict.fromkeys(candidates) if c not in explored]
+                candidates = []
+                explored.update(level)
+                xml_texts = await asyncio.gather(*(_fetch(client, c) for c in level))
+                for xml_text in xml_texts:
+                    if not xml_text or len(urls) >= 5000:
+                        continue
+                    page_urls, child_sitemaps = _parse(xml_text)
+                    for child in child_sitemaps:
+                        if child not in explored:
+                            candidates.append(child)
+                    for u in page_urls:
+                        if u in seen:
+                            continue
+                        if not host_filter.is_allowed(u):
+                            continue
+                        low = u.lower()
+                        if low.endswith(".pdf") or ".pdf?" in low:
+                            continue  # PDFs flow through the dedicated PDF queue
+                        seen.add(u)
+                        urls.append(u)
+                        if len(urls) >= 5000:
+                            break
 
         return urls
 
     @classmethod
     def _matches_allow_priority(cls, url: str, title: str = "") -> bool:
-        haystack = f"{(url or '').lower()} {(title or '').lower()}".strip()
-        return any(token in haystack for token in cls.ALLOW_PRIORITY_TOKENS)
+        # Tokens carry no spaces, so matching url and title separately equals
+        # matching the old "url title" haystack, minus building it.
+        return bool(
+            cls._ALLOW_PRIORITY_RE.search((url or "").lower())
+            or (title and cls._ALLOW_PRIORITY_RE.search(title.lower()))
+        )
 
     def _invalid_reason(
         self, url: str, title: str, content: str, min_content_words: int = 5
@@ -188,18 +335,21 @@ class CrawlWorker:
         Uses PageClassifier for blocking decisions and should_index_page
         for content filtering.
         """
-        url_lc = (url or "").lower()
-        parsed = urlparse(url_lc)
+        # Cheapest checks first: the root-path and blank checks run before
+        # the page body is copied by strip().lower().
         if not content:
             return "empty_content"
-        normalized = content.strip().lower()
-        if not normalized:
-            return "blank_content"
-        if parsed.path in ("", "/"):
+        if urlparse((url or "").lower()).path in ("", "/"):
             return "root_path"
+        if content.isspace():
+            return "blank_content"
+        normalized = content.strip().lower()
         if "página no encontrada" in normalized or "pagina no encontrada" in normalized:
             return "not_found_page"
-        if len(normalized.split()) < max(1, min_content_words):
+        # maxsplit bounds the list to min_content_words + 1 items instead of
+        # materializing every word of the page.
+        min_words = max(1, min_content_words)
+        if len(normalized.split(None, min_words)) < min_words:
             return "too_short"
 
         # Use the classifier to check if this page type should be blocked
@@ -221,56 +371,70 @@ class CrawlWorker:
         value = re.sub(r"-{2,}", "-", value).strip("-")
         return value or "page"
 
-    def _save_markdown_to_disk(self, url: str, title: str, content: str) -> tuple[bool, str]:
-        base_dir = Path(settings.SITE_MD_DIR)
-        base_dir.mkdir(parents=True, exist_ok=True)
+    async def _save_markdown_to_disk(self, url: str, title: str, content: str) -> tuple[bool, str]:
         url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
         slug = self._slugify(title or url)[:80]
-        filename = f"{slug}-{url_hash}.md"
-        path = base_dir / filename
+        base_dir = Path(settings.SITE_MD_DIR)
+        path = base_dir / f"{slug}-{url_hash}.md"
+        short_path = base_dir / f"page-{url_hash}.md"
+        data = content.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        digests = CrawlWorker._markdown_digests
+        for candidate in (path, short_path):
+            key = str(candidate)
+            # The file may have been removed since it was written.
+            if digests.get(key) == digest and await asyncio.to_thread(candidate.exists):
+                digests.move_to_end(key)
+                return True, "unchanged"
+        # One thread hop per page (mkdir + write + short-name fallback) so the
+        # crawl's event loop never blocks on disk.
+        saved, reason, written = await asyncio.to_thread(
+            self._write_markdown_file,
+            base_dir,
+            path,
+            short_path,
+            data,
+        )
+        if written is not None:
+            key = str(written)
+            digests[key] = digest
+            digests.move_to_end(key)
+            while len(digests) > self.MARKDOWN_DIGEST_CACHE_MAX_ENTRIES:
+                digests.popitem(last=False)
+        return saved, reason
+
+    def _write_markdown_file(
+        self, base_dir: Path, path: Path, short_path: Path, data: bytes
+    ) -> tuple[bool, str, Path | None]:
+        if not self._markdown_dir_ready:
+            base_dir.mkdir(parents=True, exist_ok=True)
+            self._markdown_dir_ready = True
         try:
-            path.write_text(content, encoding="utf-8")
-            return True, "saved"
+            path.write_bytes(data)
+            return True, "saved", path
         except OSError:
-            short_path = base_dir / f"page-{url_hash}.md"
             try:
-                short_path.write_text(content, encoding="utf-8")
-                return True, "saved_with_short_name"
+                short_path.write_bytes(data)
+                return True, "saved_with_short_name", short_path
             except OSError as exc:
-                return False, f"save_markdown_error:{exc.__class__.__name__}"
+                return False, f"save_markdown_error:{exc.__class__.__name__}", None
 
     @staticmethod
     def _dedupe_keep_order(values: list[str]) -> list[str]:
-        seen: set[str] = set()
-        result: list[str] = []
-        for value in values:
-            if not value or value in seen:
-                continue
-            seen.add(value)
-            result.append(value)
-        return result
+        # dict preserves insertion order; fromkeys dedupes in C.
+        return list(dict.fromkeys(filter(None, values)))
 
     def _extract_pdf_links_from_html(self, html: str, base_url: str) -> list[str]:
         """Extract PDF links from HTML/markdown content."""
         try:
-            soup = BeautifulSoup(html, "html.parser")
-            pdf_links: list[str] = []
-            seen: set[str] = set()
-            for anchor in soup.find_all("a", href=True):
-                href = anchor["href"].strip()
-                if not href:
-                    continue
-                href_lower = href.lower()
-                if not (href_lower.endswith(".pdf") or ".pdf?" in href_lower):
-                    continue
-                absolute_url = urljoin(base_url, href)
-                normalized = absolute_url.split("#")[0].split("?")[0]
-                if normalized not in seen:
-                    seen.add(normalized)
-                    pdf_links.append(absolute_url)
+            # Runs inline on the crawl-result path, so anchors go through the
+            # lexbor (C) parser rather than BeautifulSoup's pure-Python one.
+            pdf_links = ScrapingService.extract_pdf_links(html, base_url)
+            seen = {link.split("#")[0].split("?")[0] for link in pdf_links}
             # Also parse markdown links when HTML parser doesn't catch links.
-            for match in re.findall(r"\[[^\]]+\]\(([^)]+\.pdf(?:\?[^)]*)?)\)", html, flags=re.IGNORECASE):
-                absolute_url = urljoin(base_url, match.strip())
+            for match in _MARKDOWN_PDF_LINK_RE.findall(html):
+                href = match.strip()
+                absolute_url = href if href.lower().startswith(_ABSOLUTE_URL_PREFIXES) else urljoin(base_url, href)
                 normalized = absolute_url.split("#")[0].split("?")[0]
                 if normalized not in seen:
                     seen.add(normalized)
@@ -279,15 +443,19 @@ class CrawlWorker:
         except Exception:
             return []
 
+    @staticmethod
+    async def _aclose_stream(stream: Any) -> None:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is None:
+            return
+        try:
+            await aclose()
+        except Exception as exc:
+            logger.debug("Closing crawl stream failed: %s", exc)
+
     @staticmethod
     def _extract_year_candidates(value: str) -> set[int]:
-        years: set[int] = set()
-        for raw in re.findall(r"(20\d{2})", value or ""):
-            try:
-                years.add(int(raw))
-            except ValueError:
-                continue
-        return years
+        return {int(raw) for raw in _YEAR_CANDIDATE_RE.findall(value or "")}
 
     @staticmethod
     def _is_recent_pdf_url(url: str, current_year: int, lookback_years: int) -> bool:
@@ -297,7 +465,7 @@ class CrawlWorker:
         min_year = current_year - max(0, lookback_years)
         return any(min_year <= y <= current_year for y in years)
 
-    def _write_debug_report(
+    async def _write_debug_report(
         self,
         debug_output_dir: str,
         blocked_host_urls: list[str],
@@ -308,37 +476,103 @@ class CrawlWorker:
         metrics: dict,
     ) -> None:
         debug_dir = Path(debug_output_dir)
-        debug_dir.mkdir(parents=True, exist_ok=True)
-
-        (debug_dir / "blocked_by_host_filter.txt").write_text(
-            "\n".join(self._dedupe_keep_order(blocked_host_urls)),
-            encoding="utf-8",
-        )
-        (debug_dir / "blocked_by_block_filter.txt").write_text(
-            "\n".join(self._dedupe_keep_order(blocked_block_urls)),
-            encoding="utf-8",
-        )
-        (debug_dir / "failed_fetch_or_scrape.txt").write_text(
-            "\n".join(self._dedupe_keep_order(failed_fetch_urls)),
-            encoding="utf-8",
-        )
-        (debug_dir / "skipped_invalid_content.tsv").write_text(
-            "\n".join(self._dedupe_keep_order(skipped_invalid_urls)),
-            encoding="utf-8",
-        )
-        (debug_dir / "skipped_ingestion.tsv").write_text(
-            "\n".join(self._dedupe_keep_order(skipped_ingestion_rows)),
-            encoding="utf-8",
-        )
-        (debug_dir / "summary.json").write_text(
-            json.dumps(metrics, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        (debug_dir / "finished_reason.txt").write_text(
-            str(metrics.get("finished_reason", "unknown")),
-            encoding="utf-8",
+        # The filter samples are already de-duplicated at insert time.
+        files = {
+            "blocked_by_host_filter.txt": "\n".join(blocked_host_urls),
+            "blocked_by_block_filter.txt": "\n".join(blocked_block_urls),
+            "failed_fetch_or_scrape.txt": "\n".join(self._dedupe_keep_order(failed_fetch_urls)),
+            "skipped_invalid_content.tsv": "\n".join(self._dedupe_keep_order(skipped_invalid_urls)),
+            "skipped_ingestion.tsv": "\n".join(self._dedupe_keep_order(skipped_ingestion_rows)),
+            "summary.json": json.dumps(metrics, ensure_ascii=False, indent=2),
+            "finished_reason.txt": str(metrics.get("finished_reason", "unknown")),
+        }
+        # Disk writes go to worker threads so the event loop (other jobs,
+        # API requests) isn't blocked at the end of a large crawl.
+        await asyncio.to_thread(debug_dir.mkdir, parents=True, exist_ok=True)
+        await asyncio.gather(
+            *(
+                asyncio.to_thread((debug_dir / name).write_text, data, encoding="utf-8")
+                for name, data in files.items()
+            )
         )
 
+    async def _ingest_pages(
+        self,
+        items: list[dict[str, Any]],
+        allowed_host_exact: str | None,
+    ) -> list[tuple[dict[str, Any], dict | None, Exception | None]]:
+        """
+        Ingest pages with a single commit. Chunking, contextualizing and
+        embedding run before the write session is opened, so the transaction
+        (one SAVEPOINT per page, a failing page is rolled back alone) only
+        spans the writes. Returns (item, ingestion_result, error) per page.
+        """
+        outcomes: list[tuple[dict[str, Any], dict | None, Exception | None]] = []
+        to_write: list[tuple[dict[str, Any], PreparedChunks | None]] = []
+        pages = [
+            (
+                item,
+                self.ingestor.prepare_page(
+                    str(item.get("url") or ""),
+                    str(item.get("title") or ""),
+                    str(item.get("markdown") or ""),
+                    allowed_host_exact=allowed_host_exact,
+                ),
+            )
+            for item in items
+        ]
+        try:
+            # Short read: unchanged pages skip re-embedding, process_and_save
+            # reports them as duplicates.
+            async with async_session() as session:
+                indexed_hashes = await self.ingestor.indexed_content_hashes(
+                    session, [page["content_hash"] for _, page in pages if page.get("ok")]
+                )
+        except Exception:
+            logger.exception("Indexed hash lookup failed; embedding the whole batch")
+            indexed_hashes = set()
+        for item, page in pages:
+            if not page.get("ok"):
+                outcomes.append((item, page, None))
+                continue
+            if page["content_hash"] in indexed_hashes:
+                to_write.append((item, None))
+                continue
+            try:
+                to_write.append((item, await self.ingestor.prepare_chunks(page["clean_content"])))
+            except Exception as exc:
+                logger.exception("Failed to embed chunks for %s", page["canonical_url"])
+                outcomes.append((item, None, exc))
+
+        written: list[tuple[dict[str, Any], dict | None, Exception | None]] = []
+        try:
+            if to_write:
+                async with async_session() as session:
+                    for item, prepared in to_write:
+                        try:
+                            async with session.begin_nested():
+                                ingestion_result = await self.ingestor.process_and_save(
+                                    url=str(item.get("url") or ""),
+                                    title=str(item.get("title") or ""),
+                                    content=str(item.get("markdown") or ""),
+                                    session=session,
+                                    page_type=str(item.get("page_type") or "institutional_info"),
+                                    content_type="html",
+                                    authority_score=float(item.get("authority_score") or 0.5),
+                                    allowed_host_exact=allowed_host_exact,
+                                    autocommit=False,
+                                    prepared_chunks=prepared,
+                                )
+                            written.append((item, ingestion_result, None))
+                        except Exception as exc:  # noqa: BLE001 -- one page must not sink the batch
+                            written.append((item, None, exc))
+                    await session.commit()
+        except Exception as exc:  # noqa: BLE001 -- the caller counts each page
+            # The batch commit failed: nothing in it was persisted.
+            written = [(item, None, exc) for item, _ in to_write]
+        outcomes.extend(written)
+        return outcomes
+
     async def run_institutional_crawl(
         self,
         start_url: str,
@@ -364,74 +598,7 @@ class CrawlWorker:
 
         host_filter = ExactHostFilter(parsed_start.netloc or parsed_start.hostname or "")
         block_filter = TrackingPatternFilter(
-            patterns=[
-                "*/attachment/*",
-                "*attachment_id=*",
-                "*/feed/*",
-                "*/wp-json/*",
-                "*/wp-admin/*",
-                "*/wp-login.php*",
-                "*/xmlrpc.php*",
-                "*/?s=*",
-                "*?fluentcrm=*",
-                "*/search/*",
-                "*/siga*",
-                "*/cvm-prop-form/*",
-                # Images
-                "*.jpg*",
-                "*.jpeg*",
-                "*.png*",
-                "*.gif*",
-                "*.webp*",
-                "*.svg*",
-                # Audio
-                "*.mp3*",
-                "*.wav*",
-                "*.ogg*",
-                "*.m4a*",
-                "*.aac*",
-                # Video
-                "*.mp4*",
-                "*.webm*",
-                "*.avi*",
-                "*.mov*",
-                "*.mkv*",
-                # Binary/documents are blocked from crawler traversal.
-                # PDFs are handled asynchronously when extracted from HTML pages.
-                "*.pdf*",
-                "*.doc*",
-                "*.docx*",
-                "*.xls*",
-                "*.xlsx*",
-                "*.ppt*",
-                "*.pptx*",
-                "*/wp-content/uploads/*",
-                # Archives
-                "*.zip*",
-                "*.rar*",
-                "*.7z*",
-                # ── NEWS / EVENTS / COMMUNICATIONS — hard blocked ──
-                "*/noticia/*",
-                "*/noticias/*",
-                "*/notimed/*",
-                "*/novedad/*",
-                "*/novedades/*",
-                "*/prensa/*",
-                "*/comunicado/*",
-                "*/comunicados/*",
-                "*/blog/*",
-                "*/news/*",
-                "*/evento/*",
-                "*/eventos/*",
-                "*/agenda/*",
-                "*/actualidad/*",
-                "*/actualidades/*",
-                "*/boletin/*",
-                "*/newsletter/*",
-                "*/gacetilla/*",
-                "*/efemeride/*",
-                "*/efemerides/*",
-            ],
+            patterns=self.BLOCK_URL_PATTERNS,
             reverse=True,
         )
         filter_chain_parts = [host_filter]
@@ -488,6 +655,7 @@ class CrawlWorker:
             "skipped_invalid_content": 0,
             "skipped_ingestion": 0,
             "skipped_save_markdown": 0,
+            "skipped_unchanged_markdown": 0,
             "skipped_processing_errors": 0,
             "skipped_db_disabled": 0,
             "blocked_by_host_filter": 0,
@@ -560,49 +728,64 @@ class CrawlWorker:
                 if skipped_db_disabled:
                     metrics["skipped_db_disabled"] += int(skipped_db_disabled)
 
+        async def _ingest_batch(items: list[dict[str, Any]]) -> None:
+            outcomes = await self._ingest_pages(items, start_host_exact)
+            saved = skipped = errors = 0
+            for item, ingestion_result, exc in outcomes:
+                if exc is not None:
+                    errors += 1
+                    skipped_ingestion_rows.append(
+                        f"{item.get('url')}\tprocessing_error:{exc.__class__.__name__}"
+                    )
+                elif ingestion_result.get("saved"):
+                    saved += 1
+                else:
+                    skipped += 1
+                    reason = ingestion_result.get("reason", "unknown")
+                    skipped_ingestion_rows.append(f"{item.get('url')}\t{reason}")
+            await _apply_metric_delta(
+                saved_docs=saved,
+                skipped_ingestion=skipped,
+                skipped_processing_errors=errors,
+            )
+
         async def _ingest_consumer() -> None:
             nonlocal ingest_inflight
             while True:
+                # Take whatever is already queued (up to INGEST_BATCH_SIZE) so a
+                # busy queue shares one session and commit; an idle one doesn't wait.
+                batch: list[dict[str, Any]] = []
+                stop = False
                 item = await ingest_queue.get()
-                if item is None:
-                    ingest_queue.task_done()
-                    break
+                while True:
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.INGEST_BATCH_SIZE or ingest_queue.empty():
+                        break
+                    item = ingest_queue.get_nowait()
+                taken = len(batch) + int(stop)
+                inflight_added = 0
                 try:
-                    if not persist_to_db:
-                        await _apply_metric_delta(skipped_db_disabled=1)
-                        continue
-                    async with metrics_lock:
-                        ingest_inflight += 1
-                    await _sync_queue_metrics()
-                    async with async_session() as session:
-                        ingestion_result = await self.ingestor.process_and_save(
-                            url=str(item.get("url") or ""),
-                            title=str(item.get("title") or ""),
-                            content=str(item.get("markdown") or ""),
-                            session=session,
-                            page_type=str(item.get("page_type") or "institutional_info"),
-                            content_type="html",
-                            authority_score=float(item.get("authority_score") or 0.5),
-                            allowed_host_exact=start_host_exact,
-                        )
-                    if ingestion_result.get("saved"):
-                        await _apply_metric_delta(saved_docs=1)
-                    else:
-                        await _apply_metric_delta(skipped_ingestion=1)
-                        reason = ingestion_result.get("reason", "unknown")
-                        skipped_ingestion_rows.append(f"{item.get('url')}\t{reason}")
-                except Exception as exc:
-                    await _apply_metric_delta(skipped_processing_errors=1)
-                    skipped_ingestion_rows.append(
-                        f"{item.get('url')}\tprocessing_error:{exc.__class__.__name__}"
-                    )
+                    if batch and not persist_to_db:
+                        await _apply_metric_delta(skipped_db_disabled=len(batch))
+                    elif batch:
+                        async with metrics_lock:
+                            ingest_inflight += len(batch)
+                            inflight_added = len(batch)
+                        await _sync_queue_metrics()
+                        await _ingest_batch(batch)
                 finally:
                     async with metrics_lock:
-                        ingest_inflight = max(0, ingest_inflight - 1)
-                    ingest_queue.task_done()
+                        ingest_inflight = max(0, ingest_inflight - inflight_added)
+                    for _ in range(taken):
+                        ingest_queue.task_done()
                     await _sync_queue_metrics()
-                    if progress_hook:
+                    if progress_hook and batch:
                         progress_hook(metrics)
+                if stop:
+                    break
 
         async def _pdf_consumer() -> None:
             nonlocal pdf_inflight
@@ -627,8 +810,7 @@ class CrawlWorker:
                     if not host_filter.is_allowed(result.url):
                         async with metrics_lock:
                             metrics["blocked_by_host_filter"] = int(metrics.get("blocked_by_host_filter", 0)) + 1
-                        if len(host_filter.rejected_url_samples) < 50000:
-                            host_filter.rejected_url_samples.append(result.url)
+                        host_filter.record_rejected(result.url)
                         continue
 
                     if persist_to_db:
@@ -710,8 +892,7 @@ class CrawlWorker:
             # Hard guardrail: never ingest out-of-domain URLs.
             if not host_filter.is_allowed(res_url):
                 metrics["blocked_by_host_filter"] = int(metrics.get("blocked_by_host_filter", 0)) + 1
-                if len(host_filter.rejected_url_samples) < 50000:
-                    host_filter.rejected_url_samples.append(res_url)
+                host_filter.record_rejected(res_url)
                 if progress_hook:
                     progress_hook(metrics)
                 return
@@ -755,12 +936,14 @@ class CrawlWorker:
 
             try:
                 if save_markdown_files:
-                    saved_file, save_reason = self._save_markdown_to_disk(
+                    saved_file, save_reason = await self._save_markdown_to_disk(
                         res_url,
                         page_title,
                         res_markdown,
                     )
-                    if saved_file:
+                    if save_reason == "unchanged":
+                        metrics["skipped_unchanged_markdown"] += 1
+                    elif saved_file:
                         metrics["saved_markdown_files"] += 1
                     else:
                         metrics["skipped_save_markdown"] += 1
@@ -794,8 +977,7 @@ class CrawlWorker:
                         continue
                     if not host_filter.is_allowed(normalized_pdf):
                         metrics["blocked_by_host_filter"] = int(metrics.get("blocked_by_host_filter", 0)) + 1
-                        if len(host_filter.rejected_url_samples) < 50000:
-                            host_filter.rejected_url_samples.append(normalized_pdf)
+                        host_filter.record_rejected(normalized_pdf)
                         continue
                     if not self._is_recent_pdf_url(
                         normalized_pdf,
@@ -848,16 +1030,22 @@ class CrawlWorker:
                         crawl_result = await crawler.arun(start_url, config=config)
 
                     if hasattr(crawl_result, "__aiter__"):
-                        async for res in crawl_result:
-                            if res is None:
-                                continue
-                            await on_result_hook(res)
-                            if (
-                                count_valid_pages_only
-                                and metrics["accepted_valid_pages"] >= max_pages
-                            ):
-                                metrics["finished_reason"] = "target_reached"
-                                break
+                        try:
+                            async for res in crawl_result:
+                                if res is None:
+                                    continue
+                                await on_result_hook(res)
+                                if (
+                                    count_valid_pages_only
+                                    and metrics["accepted_valid_pages"] >= max_pages
+                                ):
+                                    metrics["finished_reason"] = "target_reached"
+                                    break
+                        finally:
+                            # Leaving `async for` doesn't close an async generator:
+                            # without this the BFS keeps fetching (and buffering)
+                            # pages past target_reached until the loop GCs it.
+                            await self._aclose_stream(crawl_result)
                     else:
                         fallback_results = []
                         if isinstance(crawl_result, list):
@@ -877,10 +1065,13 @@ class CrawlWorker:
                     crawl_result = await crawler.arun(start_url, config=config)
                     if crawl_result is not None:
                         if hasattr(crawl_result, "__aiter__"):
-                            async for res in crawl_result:
-                                if res is None:
-                                    continue
-                                await on_result_hook(res)
+                            try:
+                                async for res in crawl_result:
+                                    if res is None:
+                                        continue
+                                    await on_result_hook(res)
+                            finally:
+                                await self._aclose_stream(crawl_result)
                         else:
                             await on_result_hook(crawl_result)
                 finally:
@@ -896,6 +1087,7 @@ class CrawlWorker:
                 await pdf_queue.put(None)
             await asyncio.gather(*consumers, return_exceptions=True)
             await asyncio.gather(*pdf_consumers, return_exceptions=True)
+            await self.pdf_service.aclose()
             await _sync_queue_metrics()
 
         # Finalize
@@ -908,7 +1100,7 @@ class CrawlWorker:
             progress_hook(metrics)
 
         if debug_output_dir:
-            self._write_debug_report(
+            await self._write_debug_report(
                 debug_output_dir=debug_output_dir,
                 blocked_host_urls=host_filter.rejected_url_samples,
                 blocked_block_urls=block_filter.rejected_url_samples,
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import re
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.ingestion_service import _CHUNK_COPY_COLUMNS, IngestionService
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+TRICKY_TEXT = "ruta C:\\carreras\\medicina\tcol2\nlinea2\r\nfin\x00 \\N literal"
+TRICKY_CONTEXT = "contexto\\n no es salto\ty tab"
+EMBEDDINGS = [[0.5, -1.25, 3e-05], [1.0, 0.0, -2.5]]
+CREATED_AT = datetime(2026, 3, 1, 12, 30, 45, 123456)
+DOC_TITLE = "Medicina\tPlan 2026\\"
+
+_COPY_ESCAPE_RE = re.compile(r"\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|(.))", re.DOTALL)
+_COPY_SIMPLE_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+def _decode_copy_field(field: str) -> str | None:
+    """Reference decoder for one COPY (FORMAT text) field, per the Postgres docs."""
+    if field == "\\N":
+        return None
+
+    def _unescape(match: re.Match) -> str:
+        octal, hexa, char = match.groups()
+        if octal:
+            return chr(int(octal, 8))
+        if hexa:
+            return chr(int(hexa, 16))
+        return _COPY_SIMPLE_ESCAPES.get(char, char)
+
+    return _COPY_ESCAPE_RE.sub(_unescape, field)
+
+
+class CapturingConnection:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def copy_to_table(self, table_name, *, source, columns, format):
+        self.calls.append({"table": table_name, "source": source.read(), "columns": columns, "format": format})
+
+
+class FakeSession:
+    def __init__(self, driver_connection) -> None:
+        raw = SimpleNamespace(driver_connection=driver_connection)
+
+        async def get_raw_connection():
+            return raw
+
+        self._conn = SimpleNamespace(get_raw_connection=get_raw_connection)
+
+    async def connection(self):
+        return self._conn
+
+
+def _copy(session, doc_id) -> None:
+    asyncio.run(
+        IngestionService._copy_chunks(
+            session,
+            doc_id,
+            [TRICKY_TEXT, "segundo chunk"],
+            [TRICKY_CONTEXT, ""],
+            EMBEDDINGS,
+            True,
+            CREATED_AT,
+            doc_title=DOC_TITLE,
+        )
+    )
+
+
+def test_copy_chunks_text_format_round_trips_special_characters() -> None:
+    driver = CapturingConnection()
+    doc_id = uuid.uuid4()
+
+    _copy(FakeSession(driver), doc_id)
+
+    (call,) = driver.calls
+    assert call["table"] == "chunks"
+    assert call["format"] == "text"
+    assert call["columns"] == _CHUNK_COPY_COLUMNS
+    payload = call["source"].decode("utf-8")
+    assert payload.endswith("\n")
+    lines = payload[:-1].split("\n")
+    assert len(lines) == 2
+
+    rows = [dict(zip(_CHUNK_COPY_COLUMNS, map(_decode_copy_field, line.split("\t")))) for line in lines]
+    first, second = rows
+    assert first["doc_id"] == str(doc_id)
+    assert first["chunk_id"] == "0"
+    assert first["text"] == TRICKY_TEXT.replace("\x00", "")
+    assert first["context"] == TRICKY_CONTEXT
+    assert second["context"] is None
+    assert first["is_career_page"] == "t"
+    assert first["token_count"] is None
+    assert datetime.fromisoformat(first["created_at"]) == CREATED_AT
+    assert first["doc_title"] == second["doc_title"] == DOC_TITLE
+    for row, vec in zip(rows, EMBEDDINGS):
+        assert [float(x) for x in row["embedding"].strip("[]").split(",")] == vec
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="Set TEST_DATABASE_URL (Postgres with pgvector) to run.")
+def test_copy_chunks_round_trips_through_postgres() -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async def run() -> list:
+        engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            async with AsyncSession(engine) as session, session.begin():
+                await session.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+                # A temp table shadows the real one for this transaction only.
+                await session.execute(
+                    text(
+                        """
+                        CREATE TEMP TABLE chunks (
+                            doc_id uuid, chunk_id int, text text, context text,
+                            embedding halfvec(3), is_career_page boolean,
+                            token_count int, created_at timestamp, doc_title text
+                        ) ON COMMIT DROP
+                        """
+                    )
+                )
+                await IngestionService._copy_chunks(
+                    session,
+                    doc_id,
+                    [TRICKY_TEXT, "segundo chunk"],
+                    [TRICKY_CONTEXT, ""],
+                    EMBEDDINGS,
+                    True,
+                    CREATED_AT,
+                    doc_title=DOC_TITLE,
+                )
+                result = await session.execute(
+                    text(
+                        """
+                        SELECT doc_id, chunk_id, text, context, embedding::text AS embedding,
+                               is_career_page, token_count, created_at, doc_title
+                        FROM chunks ORDER BY chunk_id
+                        """
+                    )
+                )
+                return result.mappings().all()
+        finally:
+            await engine.dispose()
+
+    doc_id = uuid.uuid4()
+    first, second = asyncio.run(run())
+    assert first["doc_id"] == doc_id
+    assert first["text"] == TRICKY_TEXT.replace("\x00", "")
+    assert first["context"] == TRICKY_CONTEXT
+    assert second["context"] is None
+    assert first["is_career_page"] is True
+    assert first["token_count"] is None
+    assert first["created_at"] == CREATED_AT
+    assert first["doc_title"] == DOC_TITLE
+    # halfvec stores float16: 3e-05 rounds, the other values are exact.
+    assert [float(x) for x in first["embedding"].strip("[]").split(",")] == pytest.approx(EMBEDDINGS[0], rel=1e-3)
+    assert [float(x) for x in second["embedding"].strip("[]").split(",")] == EMBEDDINGS[1]
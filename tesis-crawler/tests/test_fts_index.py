@@ -0,0 +1,87 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.embedding.models import EMBEDDING_DIM
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="Set TEST_DATABASE_URL (Postgres with pgvector) to run."
+)
+
+
+def test_fts_matches_title_and_text_through_the_chunk_gin_index() -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlmodel import SQLModel
+
+    from app.core.ingestion_service import IngestionService
+    from app.core.rag_service import _FTS_STMT
+    from app.storage.db_client import _add_chunks_search_columns, _ensure_chunks_indexes
+
+    domain = f"fts-{uuid.uuid4().hex[:8]}.example"
+    params = {"domain_1": domain, "domain_2": f"www.{domain}", "k": 5}
+
+    async def run() -> tuple[list, list, str]:
+        engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+                await conn.run_sync(SQLModel.metadata.create_all)
+                await _add_chunks_search_columns(conn)
+                await _ensure_chunks_indexes(conn)
+
+            async with AsyncSession(engine) as session:
+                source_id, doc_id = uuid.uuid4(), uuid.uuid4()
+                await session.execute(
+                    text("INSERT INTO sources (source_id, domain, created_at) VALUES (:id, :domain, now())"),
+                    {"id": source_id, "domain": domain},
+                )
+                await session.execute(
+                    text(
+                        """
+                        INSERT INTO documents (
+                            doc_id, source_id, url, canonical_url, title, content_hash,
+                            page_type, content_type, authority_score, fetched_at
+                        )
+                        VALUES (:doc_id, :source_id, :url, :url, 'Medicina', 'h', 'program_page', 'html', 0.5, now())
+                        """
+                    ),
+                    {"doc_id": doc_id, "source_id": source_id, "url": f"https://{domain}/carreras/medicina"},
+                )
+                await IngestionService._copy_chunks(
+                    session,
+                    doc_id,
+                    ["Las correlativas de segundo año.", "Horarios de cursado."],
+                    [],
+                    [[0.25] * EMBEDDING_DIM, [0.5] * EMBEDDING_DIM],
+                    True,
+                    "2026-03-01 12:00:00",
+                    doc_title="Medicina",
+                )
+                # "medicina" is only in the title, "correlativas" only in the text.
+                both = (await session.execute(_FTS_STMT, {**params, "q": "medicina correlativas"})).all()
+                title_only = (await session.execute(_FTS_STMT, {**params, "q": "medicina"})).all()
+                # A handful of test rows never makes an index cheaper than a
+                # scan: rule scans out to see whether the GIN can serve the match.
+                await session.execute(text("ANALYZE chunks"))
+                await session.execute(text("SET LOCAL enable_seqscan = off"))
+                await session.execute(text("SET LOCAL enable_indexscan = off"))
+                plan = (
+                    await session.execute(
+                        text("EXPLAIN " + _FTS_STMT.text), {**params, "q": "medicina correlativas"}
+                    )
+                ).scalars().all()
+                await session.rollback()
+            return both, title_only, "\n".join(plan)
+        finally:
+            await engine.dispose()
+
+    both, title_only, plan = asyncio.run(run())
+
+    assert [row.chunk_text for row in both] == ["Las correlativas de segundo año."]
+    assert len(title_only) == 2
+    assert "chunks_search_tsv_gin_idx" in plan
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.core.ingestion_service import PreparedChunks
+from app.embedding.models import EMBEDDING_DIM
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="Set TEST_DATABASE_URL (Postgres with pgvector) to run."
+)
+
+
+def _page(host: str, slug: str) -> dict:
+    return {
+        "url": f"https://{host}/carreras/{slug}",
+        "title": f"Carrera {slug}",
+        "markdown": f"# Carrera {slug}\n\nPlan de estudios de la carrera {slug}, duración cinco años.",
+        "page_type": "program_page",
+    }
+
+
+def test_ingest_batch_rolls_back_only_the_failing_page(monkeypatch) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel import SQLModel
+
+    from app.tasks import worker as worker_module
+
+    host = f"batch-{uuid.uuid4().hex[:8]}.example"
+    pages = [_page(host, "medicina"), _page(host, "rota"), _page(host, "enfermeria")]
+    prepared_for: list[str] = []
+
+    async def prepare_chunks(content: str) -> PreparedChunks:
+        prepared_for.append(content)
+        # A 3-dim vector cannot go into halfvec(EMBEDDING_DIM): the COPY fails
+        # after the page's document row was already flushed.
+        dim = 3 if "rota" in content else EMBEDDING_DIM
+        return PreparedChunks(texts=[content], contexts=[""], embeddings=[[0.25] * dim])
+
+    async def run() -> tuple[list, list, list, set]:
+        engine = create_async_engine(TEST_DATABASE_URL)
+        monkeypatch.setattr(
+            worker_module, "async_session", sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        )
+        crawl_worker = worker_module.CrawlWorker()
+        monkeypatch.setattr(crawl_worker.ingestor, "prepare_chunks", prepare_chunks)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+                await conn.run_sync(SQLModel.metadata.create_all)
+
+            first = await crawl_worker._ingest_pages(pages, host)
+            second = await crawl_worker._ingest_pages(pages, host)
+
+            async with engine.connect() as conn:
+                rows = await conn.execute(
+                    text(
+                        """
+                        SELECT d.canonical_url, COUNT(c.id) AS chunks
+                        FROM documents d
+                        JOIN sources s ON s.source_id = d.source_id
+                        LEFT JOIN chunks c ON c.doc_id = d.doc_id
+                        WHERE s.domain = :host
+                        GROUP BY d.canonical_url
+                        """
+                    ),
+                    {"host": host},
+                )
+                stored = {(url, int(count)) for url, count in rows.all()}
+                for table in ("program_facts", "documents"):
+                    await conn.execute(
+                        text(
+                            f"""
+                            DELETE FROM {table}
+                            WHERE source_id IN (SELECT source_id FROM sources WHERE domain = :host)
+                            """
+                        ),
+                        {"host": host},
+                    )
+                await conn.execute(text("DELETE FROM sources WHERE domain = :host"), {"host": host})
+                await conn.commit()
+            return first, second, list(prepared_for), stored
+        finally:
+            await engine.dispose()
+
+    first, second, prepared, stored = asyncio.run(run())
+
+    by_url = {item["url"]: (result, exc) for item, result, exc in first}
+    assert by_url[pages[0]["url"]][0] == {"saved": True, "reason": "saved"}
+    assert by_url[pages[2]["url"]][0] == {"saved": True, "reason": "saved"}
+    failed_result, failed_exc = by_url[pages[1]["url"]]
+    assert failed_result is None
+    assert failed_exc is not None
+    assert stored == {(pages[0]["url"], 1), (pages[2]["url"], 1)}
+
+    # Second pass: the committed pages are unchanged and skip embedding; only
+    # the page that was rolled back is prepared again.
+    assert len(prepared) == 4
+    assert "rota" in prepared[-1]
+    second_by_url = {item["url"]: (result, exc) for item, result, exc in second}
+    assert second_by_url[pages[0]["url"]][0] == {"saved": False, "reason": "duplicate_content"}
+    assert second_by_url[pages[2]["url"]][0] == {"saved": False, "reason": "duplicate_content"}
+    assert second_by_url[pages[1]["url"]][1] is not None
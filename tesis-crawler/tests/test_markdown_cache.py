@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+
+from app.tasks import worker as worker_module
+from app.tasks.worker import CrawlWorker
+
+URL = "https://med.unne.edu.ar/carreras/medicina"
+TITLE = "Medicina"
+
+
+def _worker(monkeypatch, tmp_path) -> CrawlWorker:
+    monkeypatch.setattr(worker_module.settings, "SITE_MD_DIR", str(tmp_path))
+    monkeypatch.setattr(CrawlWorker, "_markdown_digests", OrderedDict())
+    return CrawlWorker()
+
+
+def _save(crawl_worker: CrawlWorker, content: str = "# Medicina") -> tuple[bool, str]:
+    return asyncio.run(crawl_worker._save_markdown_to_disk(URL, TITLE, content))
+
+
+def test_markdown_write_is_skipped_only_while_the_file_exists(monkeypatch, tmp_path) -> None:
+    crawl_worker = _worker(monkeypatch, tmp_path)
+
+    assert _save(crawl_worker) == (True, "saved")
+    assert _save(crawl_worker) == (True, "unchanged")
+    assert _save(crawl_worker, "# Medicina 2026") == (True, "saved")
+
+    (written,) = tmp_path.iterdir()
+    written.unlink()
+    assert _save(crawl_worker, "# Medicina 2026") == (True, "saved")
+    assert written.read_text(encoding="utf-8") == "# Medicina 2026"
+
+
+def test_markdown_cache_is_keyed_by_the_short_name_fallback(monkeypatch, tmp_path) -> None:
+    crawl_worker = _worker(monkeypatch, tmp_path)
+    url_hash = hashlib.sha1(URL.encode("utf-8")).hexdigest()[:10]
+    # A directory in place of the long file name makes that write fail.
+    (tmp_path / f"medicina-{url_hash}.md").mkdir()
+    short_path = tmp_path / f"page-{url_hash}.md"
+
+    assert _save(crawl_worker) == (True, "saved_with_short_name")
+    assert list(CrawlWorker._markdown_digests) == [str(short_path)]
+    assert _save(crawl_worker) == (True, "unchanged")
+
+    short_path.unlink()
+    assert _save(crawl_worker) == (True, "saved_with_short_name")
+    assert short_path.exists()
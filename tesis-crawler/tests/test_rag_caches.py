@@ -0,0 +1,109 @@
+import asyncio
+
+from app.core import rag_service
+from app.core.rag_service import RAGService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class CountingEmbedder:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def aembed_query(self, query: str) -> list[float]:
+        self.calls.append(query)
+        return [float(len(query)), 1.0]
+
+
+def _service(monkeypatch) -> tuple[RAGService, FakeClock]:
+    clock = FakeClock()
+    monkeypatch.setattr(rag_service.time, "monotonic", clock.monotonic)
+    return RAGService(), clock
+
+
+def test_embed_cache_hits_until_ttl_expires(monkeypatch) -> None:
+    rag, clock = _service(monkeypatch)
+    rag.embedder = CountingEmbedder()
+
+    asyncio.run(rag._embed_query("Materias de primer año"))
+    asyncio.run(rag._embed_query("  materias DE primer año "))
+    assert rag.embedder.calls == ["Materias de primer año"]
+
+    clock.now += rag.EMBED_CACHE_TTL_SECONDS + 1
+    asyncio.run(rag._embed_query("Materias de primer año"))
+    assert len(rag.embedder.calls) == 2
+
+
+def test_embed_cache_evicts_least_recently_used(monkeypatch) -> None:
+    rag, _clock = _service(monkeypatch)
+    rag.embedder = CountingEmbedder()
+    rag.EMBED_CACHE_MAX_ENTRIES = 2
+
+    asyncio.run(rag._embed_query("a"))
+    asyncio.run(rag._embed_query("b"))
+    asyncio.run(rag._embed_query("a"))  # refresh "a"; "b" is now the oldest
+    asyncio.run(rag._embed_query("c"))
+    asyncio.run(rag._embed_query("a"))
+    assert rag.embedder.calls == ["a", "b", "c"]
+
+    asyncio.run(rag._embed_query("b"))
+    assert rag.embedder.calls == ["a", "b", "c", "b"]
+
+
+def test_rewrite_cache_expires_and_evicts(monkeypatch) -> None:
+    rag, clock = _service(monkeypatch)
+    rag.REWRITE_CACHE_MAX_ENTRIES = 1
+    calls: list[str] = []
+
+    async def helper(system, user, **kwargs):
+        calls.append(user)
+        return {"query": f"reescrita {len(calls)}"}
+
+    monkeypatch.setattr(rag, "_helper_json_call", helper)
+
+    def rewrite(query: str) -> str:
+        state = {"query": query, "history": ["user: enfermería"]}
+        return asyncio.run(rag.rewrite(state))["resolved_query"]
+
+    assert rewrite("y de segundo año?") == "reescrita 1"
+    assert rewrite("y de segundo año?") == "reescrita 1"
+    assert len(calls) == 1
+
+    assert rewrite("y la duración?") == "reescrita 2"
+    assert rewrite("y de segundo año?") == "reescrita 3"  # evicted by the second query
+
+    clock.now += rag.REWRITE_CACHE_TTL_SECONDS + 1
+    assert rewrite("y de segundo año?") == "reescrita 4"
+
+
+def test_context_cache_exact_and_semantic_expiry(monkeypatch) -> None:
+    rag, clock = _service(monkeypatch)
+    unit = rag._unit_vector([3.0, 4.0])
+    rag._store_cached_context("src", "materias primer año", unit, ["ctx"])
+
+    assert rag._cached_context_exact("src", "materias primer año") == ["ctx"]
+    assert rag._cached_context_exact("other", "materias primer año") is None
+    assert rag._cached_context_semantic("src", rag._unit_vector([3.0, 4.01])) == ["ctx"]
+    assert rag._cached_context_semantic("src", rag._unit_vector([4.0, -3.0])) is None
+
+    clock.now += rag.RETRIEVE_CACHE_TTL_SECONDS + 1
+    assert rag._cached_context_exact("src", "materias primer año") is None
+    assert rag._cached_context_semantic("src", unit) is None
+    assert not rag._semantic_cache["src"]
+
+
+def test_context_cache_evicts_oldest_semantic_entry_per_source(monkeypatch) -> None:
+    rag, _clock = _service(monkeypatch)
+    rag.RETRIEVE_SEMANTIC_CACHE_PER_SOURCE = 2
+    rag._store_cached_context("src", "q1", [1.0, 0.0], ["c1"])
+    rag._store_cached_context("src", "q2", [0.0, 1.0], ["c2"])
+    rag._store_cached_context("src", "q3", [-1.0, 0.0], ["c3"])
+
+    assert list(rag._semantic_cache["src"]) == ["q2", "q3"]
+    assert rag._cached_context_semantic("src", [1.0, 0.0]) is None
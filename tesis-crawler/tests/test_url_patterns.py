@@ -0,0 +1,70 @@
+from fnmatch import fnmatchcase
+
+import pytest
+from crawl4ai.deep_crawling.filters import URLPatternFilter
+
+from app.tasks.worker import CrawlWorker, TrackingPatternFilter, _compile_glob_alternation
+
+BASE = "https://med.unne.edu.ar"
+BLOCK_PATTERNS = CrawlWorker.BLOCK_URL_PATTERNS
+ALLOW_TOKENS = CrawlWorker.ALLOW_PRIORITY_TOKENS
+
+
+def _samples() -> list[str]:
+    urls = [
+        BASE,
+        f"{BASE}/",
+        f"{BASE}/carreras/medicina",
+        f"{BASE}/carreras/medicina/plan-de-estudios",
+        f"{BASE}/ingreso-2026/?page=2",
+        f"{BASE}/institucional/autoridades#decano",
+        f"{BASE}/noticias",
+        f"{BASE}/noticias-y-eventos/",
+        f"{BASE}/agenda-academica/",
+        f"{BASE}/siga",
+        f"{BASE}/sigaweb/login",
+        f"{BASE}/wp-content/themes/unne/style.css",
+        f"{BASE}/archivo.pdf",
+        f"{BASE}/Documento.PDF",
+        f"{BASE}/imagen.jpg?ver=3",
+        f"{BASE}/?s=medicina",
+        f"{BASE}/search?q=medicina",
+        f"{BASE}/tramites/?fluentcrm=1&route=unsubscribe",
+        f"{BASE}/index.php?attachment_id=12",
+        f"{BASE}/carreras/kinesiologia-y-fisiatria/\nfeed/",
+    ]
+    # One hit and one near miss per pattern, built from its literal body.
+    for pattern in BLOCK_PATTERNS:
+        body = pattern.strip("*").replace("*", "x").replace("?", "q")
+        urls.append(f"{BASE}/a{body}b")
+        urls.append(f"{BASE}/a{body[:-1]}")
+    for token in ALLOW_TOKENS:
+        urls.append(f"{BASE}{token}")
+        urls.append(f"{BASE}{token[:-1]}")
+        urls.append(f"{BASE}/otra{token}-2026/")
+    return list(dict.fromkeys(urls))
+
+
+URLS = _samples()
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_block_alternation_matches_fnmatch(url: str) -> None:
+    combined = _compile_glob_alternation(tuple(BLOCK_PATTERNS))
+    expected = any(fnmatchcase(url, pattern) for pattern in BLOCK_PATTERNS)
+    assert (combined.search(url) is not None) == expected
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_block_filter_agrees_with_crawl4ai(url: str) -> None:
+    tracking = TrackingPatternFilter(BLOCK_PATTERNS, reverse=True)
+    assert tracking._combined is not None
+    reference = URLPatternFilter(BLOCK_PATTERNS, reverse=True)
+    assert tracking.apply(url) == reference.apply(url.lower())
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_allow_priority_regex_matches_token_globs(url: str) -> None:
+    lowered = url.lower()
+    expected = any(fnmatchcase(lowered, f"*{token}*") for token in ALLOW_TOKENS)
+    assert CrawlWorker._matches_allow_priority(url) == expected
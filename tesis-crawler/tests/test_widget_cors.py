@@ -0,0 +1,82 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import main
+
+ALLOWED = "https://www.unne.edu.ar"
+BLOCKED = "https://evil.example"
+
+
+async def _query(request):
+    return PlainTextResponse("ok")
+
+
+async def _stream(request):
+    async def body():
+        yield "event: token\n\n"
+        yield "event: final\n\n"
+
+    return StreamingResponse(body(), media_type="text/event-stream")
+
+
+def _client(monkeypatch) -> TestClient:
+    async def is_allowed(origin: str) -> bool:
+        return origin == ALLOWED
+
+    monkeypatch.setattr(main, "is_origin_allowed_globally", is_allowed)
+    inner = Starlette(
+        routes=[
+            Route("/api/widget/query", _query, methods=["POST"]),
+            Route("/API/Widget/query", _query, methods=["POST"]),
+            Route("/api/widget/query/stream", _stream, methods=["POST"]),
+            Route("/api/query", _query, methods=["POST"]),
+        ]
+    )
+    return TestClient(main.WidgetCORSMiddleware(inner))
+
+
+def test_preflight_allows_known_origin(monkeypatch) -> None:
+    response = _client(monkeypatch).options("/api/widget/query", headers={"Origin": ALLOWED})
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ALLOWED
+    assert response.headers["access-control-allow-headers"] == "Content-Type,X-API-Key"
+
+
+def test_preflight_rejects_unknown_or_missing_origin(monkeypatch) -> None:
+    client = _client(monkeypatch)
+
+    assert client.options("/api/widget/query", headers={"Origin": BLOCKED}).status_code == 403
+    assert client.options("/api/widget/query").status_code == 400
+
+
+def test_allowed_origin_gets_cors_headers_on_streamed_response(monkeypatch) -> None:
+    response = _client(monkeypatch).post("/api/widget/query/stream", headers={"Origin": ALLOWED})
+
+    assert response.status_code == 200
+    assert response.text == "event: token\n\nevent: final\n\n"
+    assert response.headers["access-control-allow-origin"] == ALLOWED
+    assert response.headers["vary"] == "Origin"
+
+
+def test_unknown_origin_passes_through_without_cors_headers(monkeypatch) -> None:
+    response = _client(monkeypatch).post("/api/widget/query", headers={"Origin": BLOCKED})
+
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_widget_path_check_ignores_case(monkeypatch) -> None:
+    response = _client(monkeypatch).post("/API/Widget/query", headers={"Origin": ALLOWED})
+
+    assert response.headers["access-control-allow-origin"] == ALLOWED
+
+
+def test_other_paths_are_not_touched(monkeypatch) -> None:
+    client = _client(monkeypatch)
+
+    response = client.post("/api/query", headers={"Origin": ALLOWED})
+    assert "access-control-allow-origin" not in response.headers
+    assert client.options("/api/query", headers={"Origin": ALLOWED}).status_code == 405
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.api import widget
+from app.core import chat_format
+
+SOURCE_ID = uuid4()
+ANSWER = (
+    "Las materias de segundo año son Anatomía Patológica y Farmacología."
+    "\n\nFuentes: https://med.unne.edu.ar/carreras/medicina"
+)
+
+
+class FakeSessionMemory:
+    def __init__(self) -> None:
+        self.assistant: list[str] = []
+        self.state: dict = {"greeting_sent": True}
+
+    async def ensure_session(self, session_id: str) -> str:
+        return session_id
+
+    async def get_state(self, session_id: str) -> dict:
+        return dict(self.state)
+
+    async def update_state(self, session_id: str, state: dict) -> None:
+        self.state = dict(state)
+
+    async def recent_history(self, session_id: str, source_id, max_items: int = 12) -> list[str]:
+        return ["user: hola"]
+
+    async def append_user(self, session_id: str, text: str, source_id) -> None:
+        return None
+
+    async def append_assistant(self, session_id: str, text: str, source_id) -> None:
+        self.assistant.append(text)
+
+
+def _setup(monkeypatch, *, pieces, verify_result=None, hang_after=None, compact_response="Respuesta compacta."):
+    memory = FakeSessionMemory()
+    monkeypatch.setattr(widget, "session_memory", memory)
+    monkeypatch.setattr(chat_format.settings, "NODE_ENV", "production")
+
+    async def authorize(req, request, x_api_key):
+        return SimpleNamespace(source_id=SOURCE_ID, clerk_user_id="user_1"), SOURCE_ID
+
+    async def rewrite(state):
+        return {"resolved_query": state["query"]}
+
+    async def retrieve(state):
+        return {"context": ["contexto"]}
+
+    async def stream_generate(state):
+        for index, piece in enumerate(pieces):
+            if hang_after is not None and index == hang_after:
+                await asyncio.sleep(3600)
+            yield piece
+
+    async def verify(state):
+        return verify_result or {"groundedness": 1.0}
+
+    class CompactGraph:
+        async def ainvoke(self, payload):
+            assert payload["session_state"]["retry_mode"] == "compact"
+            return {"response": compact_response, "context": []}
+
+    monkeypatch.setattr(widget, "_authorize_widget_query", authorize)
+    monkeypatch.setattr(widget.rag, "rewrite", rewrite)
+    monkeypatch.setattr(widget.rag, "retrieve", retrieve)
+    monkeypatch.setattr(widget.rag, "stream_generate", stream_generate)
+    monkeypatch.setattr(widget.rag, "verify", verify)
+    monkeypatch.setattr(widget.rag, "build_graph", lambda: CompactGraph())
+    return memory
+
+
+def _request() -> widget.WidgetQueryRequest:
+    return widget.WidgetQueryRequest(question="y de segundo año?", session_id="s1")
+
+
+def _parse(raw: list[str]) -> list[tuple[str, dict]]:
+    events = []
+    for chunk in raw:
+        event_line, data_line = chunk.strip().split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
+async def _collect(max_events: int | None = None) -> list[tuple[str, dict]]:
+    response = await widget.widget_query_stream(_request(), request=None, x_api_key="pfc_sk_test")
+    raw: list[str] = []
+    async for chunk in response.body_iterator:
+        raw.append(chunk)
+        if max_events is not None and len(raw) >= max_events:
+            await response.body_iterator.aclose()
+            break
+    return _parse(raw)
+
+
+def _collect_sync() -> list[tuple[str, dict]]:
+    return asyncio.run(_collect())
+
+
+def _split(text: str, size: int = 5) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_stream_tokens_match_final_answer_without_sources(monkeypatch) -> None:
+    memory = _setup(monkeypatch, pieces=_split("Hola, " + ANSWER))
+
+    events = _collect_sync()
+
+    tokens = "".join(data["text"] for name, data in events if name == "token")
+    name, final = events[-1]
+    assert name == "final"
+    assert final["answer"] == "Las materias de segundo año son Anatomía Patológica y Farmacología."
+    assert tokens == final["answer"]
+    assert "Fuentes" not in tokens
+    assert final["replaced"] is False
+    assert memory.assistant == [final["answer"]]
+
+
+def test_stream_flags_answer_replaced_by_verify(monkeypatch) -> None:
+    declined = widget.rag.VERIFY_NO_EVIDENCE_RESPONSE
+    memory = _setup(
+        monkeypatch,
+        pieces=_split(ANSWER),
+        verify_result={"response": declined, "groundedness": 0.1},
+    )
+
+    events = _collect_sync()
+
+    final = events[-1][1]
+    assert final["answer"] == declined
+    assert final["replaced"] is True
+    assert memory.assistant == [declined]
+
+
+def test_stream_timeout_retries_in_compact_mode(monkeypatch) -> None:
+    memory = _setup(monkeypatch, pieces=_split(ANSWER), hang_after=10)
+    monkeypatch.setattr(widget.settings, "RAG_GRAPH_TIMEOUT_SECONDS", 0.2)
+
+    events = _collect_sync()
+
+    final = events[-1][1]
+    assert final["answer"] == "Respuesta compacta."
+    assert final["replaced"] is True
+    assert memory.assistant == ["Respuesta compacta."]
+
+
+def test_stream_persists_reply_when_client_disconnects(monkeypatch) -> None:
+    memory = _setup(monkeypatch, pieces=_split(ANSWER, size=40))
+
+    events = asyncio.run(_collect(max_events=1))
+
+    assert events[0][0] == "token"
+    assert memory.assistant == [widget.WIDGET_FALLBACK_ANSWER]